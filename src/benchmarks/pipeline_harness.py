@@ -0,0 +1,287 @@
+"""
+End-to-end local pipeline harness
+Local directory stands in for S3 (pyarrow.fs SubTreeFileSystem)
+Runs the generator entry point for a configurable horizon
+through the configured raw writer (RAW_SINK=local),
+then the three staging entry points against the stand-in,
+checks row counts between layers and reports per-stage timings
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+import pyarrow.dataset as ds
+from pyarrow.fs import LocalFileSystem, SubTreeFileSystem
+from src.raw.source_gen.constants import DEPARTMENT_CONFIG
+from src.staging.staging_config import staging_bucket
+from src.staging.staging_utils import raw_root, staging_output_dir
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STAGING_ENTRY_POINTS = [
+    "src.staging.staging_encounter",
+    "src.staging.staging_wait_snapshot",
+    "src.staging.staging_department_snapshot",
+]
+
+# raw event type -> (staging event type, staged rows per raw event)
+LAYER_MAPPING = {
+    "admission": ("admission", 1),
+    "discharge": ("discharge", 1),
+    "wait_snapshot": ("waiting_list_snapshot", 1),
+    "dep_snapshot": ("department_snapshot", len(DEPARTMENT_CONFIG)),
+}
+
+# --------------------------------------------------
+# Stages
+# --------------------------------------------------
+
+def stand_in_env(root: str, bucket: str) -> dict:
+
+    """
+    Environment pointing generator and staging at local stand-in
+    RAW_SINK=local writes under the raw root staging reads
+    (STAGING_RAW_PREFIX, bucket root when empty),
+    STAGING_FS=local, full rebuild (no manifest)
+
+    :param root: Stand-in root directory
+    :type root: str
+    :param bucket: Staging bucket
+    :type bucket: str
+    :return: Environment
+    :rtype: dict
+    """
+
+    return dict(
+        os.environ,
+        RAW_SINK="local",
+        RAW_LOCAL_DIR=os.path.join(root, raw_root(bucket)),
+        STAGING_FS="local",
+        STAGING_LOCAL_ROOT=root,
+        STAGING_BUCKET=bucket,
+        STAGING_MANIFEST="",
+    )
+
+def run_entry_point(root: str, bucket: str, module: str, args: list[str] | None = None) -> dict:
+
+    """
+    Runs generator or staging entry point in a subprocess
+    against local stand-in
+
+    :param root: Stand-in root directory
+    :type root: str
+    :param bucket: Staging bucket
+    :type bucket: str
+    :param module: Entry point module
+    :type module: str
+    :param args: Entry point arguments
+    :type args: list[str] | None
+    :return: Stage result
+    :rtype: dict
+    """
+
+    started = time.perf_counter()
+
+    subprocess.run(
+        [sys.executable, "-m", module, *(args or [])],
+        env=stand_in_env(root, bucket),
+        cwd=REPO_ROOT,
+        check=True,
+        stdout=subprocess.DEVNULL
+    )
+
+    return {
+        "stage": module.rsplit(".", 1)[1],
+        "seconds": time.perf_counter() - started,
+    }
+
+# --------------------------------------------------
+# Layer Row Counts
+# --------------------------------------------------
+
+def raw_rows(root: str, bucket: str, raw_event_type: str) -> int:
+
+    """
+    Counts raw NDJSON events for event type
+
+    :param root: Stand-in root directory
+    :type root: str
+    :param bucket: Staging bucket
+    :type bucket: str
+    :param raw_event_type: Raw event type
+    :type raw_event_type: str
+    :return: Events
+    :rtype: int
+    """
+
+    rows = 0
+
+    for directory, _, files in os.walk(os.path.join(root, raw_root(bucket), raw_event_type)):
+        for name in files:
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name), "rb") as f:
+                    rows += sum(1 for line in f if line.strip())
+
+    return rows
+
+def staged_rows(fs, path: str) -> int:
+
+    """
+    Counts rows in staged (or quarantine) dataset, 0 if missing
+
+    :param fs: Stand-in filesystem
+    :param path: Dataset directory
+    :type path: str
+    :return: Rows
+    :rtype: int
+    """
+
+    try:
+        return ds.dataset(path, format="parquet", filesystem=fs).count_rows()
+    except FileNotFoundError:
+        return 0
+
+def check_layers(root: str, bucket: str) -> list[dict]:
+
+    """
+    Compares raw events with staged plus quarantined rows
+    Department snapshots expand to one row per ward
+
+    :param root: Stand-in root directory
+    :type root: str
+    :param bucket: Staging bucket
+    :type bucket: str
+    :return: Checks
+    :rtype: list[dict]
+    """
+
+    fs = SubTreeFileSystem(root, LocalFileSystem())
+    checks = []
+
+    for raw_event_type, (event_type, per_event) in LAYER_MAPPING.items():
+        expected = raw_rows(root, bucket, raw_event_type) * per_event
+        staged = staged_rows(fs, staging_output_dir(bucket, event_type))
+        quarantined = staged_rows(fs, staging_output_dir(bucket, f"_quarantine/{event_type}"))
+
+        checks.append({
+            "event_type": event_type,
+            "expected": expected,
+            "staged": staged,
+            "quarantined": quarantined,
+            "ok": expected == staged + quarantined,
+        })
+
+    return checks
+
+# --------------------------------------------------
+# Harness
+# --------------------------------------------------
+
+def run_harness(root: str, start: date, days: int, seed: int, bucket: str = staging_bucket) -> dict:
+
+    """
+    Runs generator and staging entry points and layer checks
+
+    :param root: Stand-in root directory
+    :type root: str
+    :param start: First simulated date
+    :type start: date
+    :param days: Simulated horizon in days
+    :type days: int
+    :param seed: Simulation seed
+    :type seed: int
+    :param bucket: Staging bucket, defaults to STAGING_BUCKET
+    :type bucket: str
+    :return: Report
+    :rtype: dict
+    """
+
+    started = time.perf_counter()
+    stages = [run_entry_point(
+        root,
+        bucket,
+        "src.raw.source_gen.main",
+        ["--seed", str(seed), "--start", start.isoformat(), "--days", str(days)]
+    )]
+    stages[0]["rows"] = sum(raw_rows(root, bucket, t) for t in LAYER_MAPPING)
+
+    for module in STAGING_ENTRY_POINTS:
+        stages.append(run_entry_point(root, bucket, module))
+
+    checks = check_layers(root, bucket)
+    seconds = time.perf_counter() - started
+
+    return {
+        "days": days,
+        "seed": seed,
+        "bucket": bucket,
+        "stages": stages,
+        "checks": checks,
+        "seconds": seconds,
+        "events_per_sec": stages[0]["rows"] / seconds,
+        "ok": all(c["ok"] for c in checks),
+    }
+
+# --------------------------------------------------
+# Entry Point
+# --------------------------------------------------
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Run generator and staging end to end against a local S3 stand-in")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 1, 28))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--root", default=None, help="Empty stand-in directory, never deleted, defaults to a temporary directory")
+    parser.add_argument("--keep", action="store_true", help="Keep temporary stand-in directory")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    if args.root:
+        root = os.path.abspath(args.root)
+
+        if os.path.isdir(root) and os.listdir(root):
+            parser.error(f"--root {root} is not empty")
+
+        os.makedirs(root, exist_ok=True)
+        created = False
+    else:
+        root = tempfile.mkdtemp(prefix="elt-harness-")
+        created = True
+
+    try:
+        report = run_harness(root, args.start, args.days, args.seed)
+    finally:
+        # Only remove directory created here, never user-supplied root
+        if created and not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    for stage in report["stages"]:
+        rows = f" rows={stage['rows']}" if "rows" in stage else ""
+        print(f"[OK] {stage['stage']} {stage['seconds']:.2f}s{rows}")
+
+    for check in report["checks"]:
+        status = "OK" if check["ok"] else "FAIL"
+        print(
+            f"[{status}] {check['event_type']} expected={check['expected']} "
+            f"staged={check['staged']} quarantined={check['quarantined']}"
+        )
+
+    print(f"[OK] Pipeline {report['seconds']:.2f}s, {report['events_per_sec']:.0f} events/s end to end")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if not report["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
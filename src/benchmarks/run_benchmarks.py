@@ -0,0 +1,591 @@
+"""
+Benchmark suite for source generator and staging hot paths
+Each case runs in a fresh process so peak RSS is per case
+Results written as JSON for comparison across commits
+"""
+
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import random
+import resource
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from src.raw.ingestion.backends import MemoryBackend, LocalBackend, QueuedBackend
+from src.raw.ingestion.s3_write import BufferedSink
+from src.raw.source_gen.admission import generate_admissions, process_discharges
+from src.raw.source_gen.constants import PATIENT_ID_START
+from src.raw.source_gen.department import Department
+from src.raw.source_gen.discharge_scheduler import DischargeScheduler
+from src.raw.source_gen.patient_registry import PatientRegistry
+from src.raw.source_gen.patient_store import CompactPatientRegistry
+from src.raw.source_gen.patients import Patient
+from src.raw.source_gen.waiting_list import WaitingList
+
+START = date(2025, 1, 28)
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+
+def peak_rss_mb() -> float:
+
+    """
+    Peak resident set size of current process in MB
+    
+    :return: Peak RSS
+    :rtype: float
+    """
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def profile_top(profiler: cProfile.Profile, top: int) -> list[dict]:
+
+    """
+    Returns top functions by own time
+    
+    :param profiler: Finished profiler
+    :type profiler: cProfile.Profile
+    :param top: Number of functions
+    :type top: int
+    :return: Function timings
+    :rtype: list[dict]
+    """
+
+    stats = pstats.Stats(profiler)
+    rows = []
+
+    for (file, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.relpath(file)}:{line}:{name}",
+            "calls": calls,
+            "tottime": round(tottime, 4),
+            "cumtime": round(cumtime, 4),
+        })
+
+    rows.sort(key=lambda r: r["tottime"], reverse=True)
+
+    return rows[:top]
+
+class SlowBackend(MemoryBackend):
+
+    """
+    In-memory backend with fixed put latency, stands in for S3 round trips
+    """
+
+    def __init__(self, latency: float):
+
+        """
+        Initialises slow backend
+        
+        :param self: References class
+        :param latency: Seconds slept per put
+        :type latency: float
+        """
+
+        super().__init__()
+        self.latency = latency
+
+    def put(self, key: str, body: bytes):
+
+        """
+        Sleeps then stores object body by key
+        
+        :param self: References class
+        :param key: Object key
+        :type key: str
+        :param body: Object body
+        :type body: bytes
+        """
+
+        time.sleep(self.latency)
+        super().put(key, body)
+
+def git_commit() -> str | None:
+
+    """
+    Current git commit, None outside a checkout
+    
+    :return: Commit hash
+    :rtype: str | None
+    """
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# --------------------------------------------------
+# Generator Benchmarks
+# --------------------------------------------------
+
+def bench_generate(days: int, registry_size: int, compact: bool, top: int) -> dict:
+
+    """
+    Runs generate_admissions against in-memory backend
+    
+    :param days: Simulated horizon in days
+    :type days: int
+    :param registry_size: Number of patients
+    :type registry_size: int
+    :param compact: Use compact registry
+    :type compact: bool
+    :param top: Number of profiled functions to report
+    :type top: int
+    :return: Result
+    :rtype: dict
+    """
+
+    backend = MemoryBackend()
+    sink = BufferedSink(backend, 1000, 5 * 1024 * 1024)
+    profiler = cProfile.Profile()
+
+    started = time.perf_counter()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        profiler.enable()
+        generate_admissions(
+            sink,
+            seed=0,
+            patient_ids=range(PATIENT_ID_START, PATIENT_ID_START + registry_size),
+            start=START,
+            end=START + timedelta(days=days - 1),
+            compact_registry=compact
+        )
+        profiler.disable()
+
+    seconds = time.perf_counter() - started
+
+    return {
+        "events": sink.events_written,
+        "seconds": seconds,
+        "events_per_sec": sink.events_written / seconds,
+        "functions": profile_top(profiler, top),
+    }
+
+def bench_generate_columnar(days: int, registry_size: int) -> dict:
+
+    """
+    Runs generate_admissions into ColumnarSink on local directory,
+    staging Parquet written directly, timed including close
+    
+    :param days: Simulated horizon in days
+    :type days: int
+    :param registry_size: Number of patients
+    :type registry_size: int
+    :return: Result
+    :rtype: dict
+    """
+
+    from pyarrow.fs import LocalFileSystem
+    from src.raw.ingestion.columnar_write import ColumnarSink
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = ColumnarSink(os.path.join(tmp, "bucket"), LocalFileSystem())
+
+        started = time.perf_counter()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_admissions(
+                sink,
+                seed=0,
+                patient_ids=range(PATIENT_ID_START, PATIENT_ID_START + registry_size),
+                start=START,
+                end=START + timedelta(days=days - 1)
+            )
+            sink.close()
+
+        seconds = time.perf_counter() - started
+
+    return {
+        "events": sink.events_written,
+        "rows": sum(sink.rows_written.values()),
+        "seconds": seconds,
+        "events_per_sec": sink.events_written / seconds,
+    }
+
+def bench_upload_overlap(days: int, registry_size: int, latency_ms: float, workers: int) -> dict:
+
+    """
+    Runs generate_admissions against slow backend, synchronous then queued
+    Prefixes flush as simulation moves past their day, so queued uploads
+    overlap simulation and only the tail is left for the final flush
+    
+    :param days: Simulated horizon in days
+    :type days: int
+    :param registry_size: Number of patients
+    :type registry_size: int
+    :param latency_ms: Put latency in milliseconds
+    :type latency_ms: float
+    :param workers: Upload threads for queued run
+    :type workers: int
+    :return: Result
+    :rtype: dict
+    """
+
+    def run(store: SlowBackend, backend) -> dict:
+        sink = BufferedSink(backend, 1000, 5 * 1024 * 1024)
+        flush = sink.flush
+        marks = {}
+
+        def timed_flush():
+            marks["flush"] = time.perf_counter()
+            flush()
+
+        sink.flush = timed_flush
+        started = time.perf_counter()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_admissions(
+                sink,
+                seed=0,
+                patient_ids=range(PATIENT_ID_START, PATIENT_ID_START + registry_size),
+                start=START,
+                end=START + timedelta(days=days - 1)
+            )
+            sink.close()
+
+        finished = time.perf_counter()
+
+        return {
+            "seconds": finished - started,
+            "final_flush_seconds": finished - marks["flush"],
+            "objects": len(store.objects),
+        }
+
+    latency = latency_ms / 1000
+    store = SlowBackend(latency)
+    synchronous = run(store, store)
+    store = SlowBackend(latency)
+    queued = run(store, QueuedBackend(store, workers, workers * 4))
+    upload_seconds = synchronous["objects"] * latency
+
+    return {
+        "objects": synchronous["objects"],
+        "upload_seconds": upload_seconds,
+        "seconds": queued["seconds"],
+        "synchronous": synchronous,
+        "queued": queued,
+        "overlap_seconds": synchronous["seconds"] - queued["seconds"],
+    }
+
+def bench_get_random_admittable(registry_size: int, calls: int, compact: bool) -> dict:
+
+    """
+    Times admittable sampling with admission churn
+    
+    :param registry_size: Number of patients
+    :type registry_size: int
+    :param calls: Number of admissions
+    :type calls: int
+    :param compact: Use compact registry
+    :type compact: bool
+    :return: Result
+    :rtype: dict
+    """
+
+    rng = random.Random(0)
+    ids = range(PATIENT_ID_START, PATIENT_ID_START + registry_size)
+
+    built = time.perf_counter()
+    registry = CompactPatientRegistry(ids, rng) if compact else PatientRegistry(ids, rng)
+    build_seconds = time.perf_counter() - built
+
+    started = time.perf_counter()
+
+    for i in range(calls):
+        day = START + timedelta(days=i // 20)
+        patient = registry.get_random_admittable(day)
+        patient.admission_date = day
+        patient.discharge_date = day + timedelta(days=rng.randint(1, 14))
+        registry.record_admission(patient)
+
+    seconds = time.perf_counter() - started
+
+    return {
+        "build_seconds": build_seconds,
+        "seconds": seconds,
+        "ops_per_sec": calls / seconds,
+    }
+
+def bench_has_patient(waiting: int, calls: int) -> dict:
+
+    """
+    Times waiting list membership checks
+    Half of lookups hit
+    
+    :param waiting: Patients on waiting list
+    :type waiting: int
+    :param calls: Number of lookups
+    :type calls: int
+    :return: Result
+    :rtype: dict
+    """
+
+    rng = random.Random(0)
+    waitinglist = WaitingList()
+    patients = [Patient(pid, rng) for pid in range(waiting * 2)]
+
+    for patient in patients[:waiting]:
+        waitinglist.add(patient, START)
+
+    lookups = [rng.choice(patients) for _ in range(calls)]
+
+    started = time.perf_counter()
+
+    for patient in lookups:
+        waitinglist.has_patient(patient)
+
+    seconds = time.perf_counter() - started
+
+    return {
+        "seconds": seconds,
+        "ops_per_sec": calls / seconds,
+    }
+
+def bench_process_discharges(occupancy: int, days: int) -> dict:
+
+    """
+    Times daily discharge processing at given occupancy
+    
+    :param occupancy: Scheduled stays
+    :type occupancy: int
+    :param days: Days processed, discharges spread across them
+    :type days: int
+    :return: Result
+    :rtype: dict
+    """
+
+    rng = random.Random(0)
+    department = Department("bench", occupancy, 1, days)
+    scheduler = DischargeScheduler()
+
+    for pid in range(occupancy):
+        department.admit()
+        scheduler.schedule(pid, department, START + timedelta(days=rng.randint(1, days)))
+
+    started = time.perf_counter()
+    discharged = 0
+
+    for i in range(1, days + 1):
+        discharged += process_discharges(scheduler, START + timedelta(days=i))
+
+    seconds = time.perf_counter() - started
+
+    return {
+        "discharged": discharged,
+        "seconds": seconds,
+        "discharges_per_sec": discharged / seconds,
+    }
+
+# --------------------------------------------------
+# Staging Benchmarks
+# --------------------------------------------------
+
+def bench_build_parquet(days: int, compacted: bool = False) -> dict:
+
+    """
+    Generates raw admissions to local directory,
+    optionally compacts raw days (not timed),
+    times build_parquet over each month
+    
+    :param days: Simulated horizon in days
+    :type days: int
+    :param compacted: Stage from compacted raw objects
+    :type compacted: bool
+    :return: Result
+    :rtype: dict
+    """
+
+    from pyarrow.fs import LocalFileSystem
+    from src.staging.compact_raw import compact_raw
+    from src.staging.staging_utils import build_parquet, list_partitions
+    from src.staging.staging_encounter import encounter_select, encounter_rename, encounter_raw_schema
+    from src.staging.schemas import encounter_schema
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bucket = os.path.join(tmp, "bucket")
+        sink = BufferedSink(LocalBackend(os.path.join(bucket, "raw")), 1000, 5 * 1024 * 1024)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_admissions(sink, seed=0, start=START, end=START + timedelta(days=days - 1))
+
+        event_dir = os.path.join(bucket, "raw", "admission")
+        fs = LocalFileSystem()
+        rows = 0
+
+        for root, _, files in os.walk(event_dir):
+            for name in files:
+                with open(os.path.join(root, name), "rb") as f:
+                    rows += sum(1 for line in f if line.strip())
+
+        if compacted:
+            with contextlib.redirect_stdout(io.StringIO()):
+                compact_raw(bucket, ["admission"], originals="delete", fs=fs)
+
+        started = time.perf_counter()
+        grouped = list_partitions(fs, event_dir, "month")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            for month, objects in grouped.items():
+                build_parquet(
+                    bucket,
+                    [f.path for f in objects],
+                    month,
+                    "admission",
+                    encounter_schema,
+                    encounter_select,
+                    encounter_rename,
+                    False,
+                    fs,
+                    encounter_raw_schema
+                )
+
+        seconds = time.perf_counter() - started
+
+    return {
+        "partitions": len(grouped),
+        "objects": sum(len(objects) for objects in grouped.values()),
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds,
+    }
+
+# --------------------------------------------------
+# Runner
+# --------------------------------------------------
+
+def run_case(name: str, func, kwargs: dict) -> dict:
+
+    """
+    Runs benchmark function, adds peak RSS
+    Executed in worker process
+    
+    :param name: Case name
+    :type name: str
+    :param func: Benchmark function
+    :param kwargs: Benchmark arguments
+    :type kwargs: dict
+    :return: Result
+    :rtype: dict
+    """
+
+    result = func(**kwargs)
+    result["peak_rss_mb"] = peak_rss_mb()
+
+    return {"name": name, "params": kwargs, **result}
+
+def run_benchmarks(args: argparse.Namespace) -> dict:
+
+    """
+    Runs every case in its own process
+    
+    :param args: Parsed CLI arguments
+    :type args: argparse.Namespace
+    :return: Report
+    :rtype: dict
+    """
+
+    cases = [
+        ("generate_admissions", bench_generate, {
+            "days": args.days,
+            "registry_size": args.registry_size,
+            "compact": args.compact,
+            "top": args.top,
+        }),
+        ("generate_columnar", bench_generate_columnar, {
+            "days": args.days,
+            "registry_size": args.registry_size,
+        }),
+        ("upload_overlap", bench_upload_overlap, {
+            "days": args.days,
+            "registry_size": args.registry_size,
+            "latency_ms": args.put_latency_ms,
+            "workers": args.upload_workers,
+        }),
+        ("get_random_admittable", bench_get_random_admittable, {
+            "registry_size": args.registry_size,
+            "calls": args.calls,
+            "compact": args.compact,
+        }),
+        ("has_patient", bench_has_patient, {
+            "waiting": args.waiting,
+            "calls": args.calls,
+        }),
+        ("process_discharges", bench_process_discharges, {
+            "occupancy": args.occupancy,
+            "days": 90,
+        }),
+        ("build_parquet", bench_build_parquet, {
+            "days": args.staging_days,
+        }),
+        ("build_parquet_compacted", bench_build_parquet, {
+            "days": args.staging_days,
+            "compacted": True,
+        }),
+    ]
+
+    results = []
+
+    for name, func, kwargs in cases:
+        if args.only and name not in args.only:
+            continue
+
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results.append(pool.submit(run_case, name, func, kwargs).result())
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+# --------------------------------------------------
+# Entry Point
+# --------------------------------------------------
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark generator and staging hot paths")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--registry-size", type=int, default=5000)
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--waiting", type=int, default=5000)
+    parser.add_argument("--occupancy", type=int, default=10000)
+    parser.add_argument("--staging-days", type=int, default=31)
+    parser.add_argument("--put-latency-ms", type=float, default=20.0)
+    parser.add_argument("--upload-workers", type=int, default=8)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--only", nargs="*", default=None)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for r in report["results"]:
+        print(f"[OK] {r['name']} {r['seconds']:.3f}s peak_rss={r['peak_rss_mb']:.0f}MB")
+
+    print(f"[OK] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
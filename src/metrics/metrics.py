@@ -0,0 +1,424 @@
+"""
+Lightweight metrics for generator and staging hot paths
+Counters, gauges, histograms and timers keyed by name and labels
+Ratios are gauges derived from two counters at export
+Disabled unless METRICS_EXPORT is json or prometheus,
+disabled calls return before touching the registry
+Exported at exit as JSON log lines or a Prometheus textfile
+"""
+
+import atexit
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from src.metrics.metrics_config import metrics_export, metrics_path, latency_buckets
+
+# --------------------------------------------------
+# Registry
+# --------------------------------------------------
+
+_enabled = metrics_export in ("json", "prometheus")
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+_ratios = {}
+_disabled_timer = nullcontext()
+
+def enabled() -> bool:
+
+    """
+    Returns whether metrics are recorded
+
+    :return: Metrics enabled
+    :rtype: bool
+    """
+
+    return _enabled
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted(labels.items())))
+
+def inc(name: str, value: float = 1, **labels):
+
+    """
+    Increments counter
+
+    :param name: Metric name
+    :type name: str
+    :param value: Increment
+    :type value: float
+    :param labels: Metric labels
+    """
+
+    if not _enabled:
+        return
+
+    key = _key(name, labels)
+
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def set_gauge(name: str, value: float, **labels):
+
+    """
+    Sets gauge to value
+
+    :param name: Metric name
+    :type name: str
+    :param value: Value
+    :type value: float
+    :param labels: Metric labels
+    """
+
+    if not _enabled:
+        return
+
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+def observe(name: str, value: float, buckets: tuple[float, ...] = latency_buckets, **labels):
+
+    """
+    Records value in histogram
+    Buckets fixed by first observation of a series
+
+    :param name: Metric name
+    :type name: str
+    :param value: Observed value
+    :type value: float
+    :param buckets: Upper bounds, +Inf implied
+    :type buckets: tuple[float, ...]
+    :param labels: Metric labels
+    """
+
+    if not _enabled:
+        return
+
+    key = _key(name, labels)
+
+    with _lock:
+        histogram = _histograms.get(key)
+
+        if histogram is None:
+            histogram = _histograms[key] = {
+                "buckets": buckets,
+                "counts": [0] * (len(buckets) + 1),
+                "sum": 0.0,
+                "count": 0,
+            }
+
+        histogram["counts"][bisect.bisect_left(histogram["buckets"], value)] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+def ratio(name: str, numerator: str, denominator: str):
+
+    """
+    Registers gauge derived at export as numerator / denominator,
+    counters matched by labels (e.g. rows / seconds)
+    Computed from counters, so it stays correct after merging
+    snapshots, where a set_gauge value would be last-write-wins
+
+    :param name: Gauge name
+    :type name: str
+    :param numerator: Counter name
+    :type numerator: str
+    :param denominator: Counter name
+    :type denominator: str
+    """
+
+    _ratios[name] = (numerator, denominator)
+
+@contextmanager
+def _timer(name: str, labels: dict):
+
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+def timer(name: str, **labels):
+
+    """
+    Context manager observing elapsed seconds in histogram
+
+    :param name: Metric name
+    :type name: str
+    :param labels: Metric labels
+    :return: Context manager
+    """
+
+    if not _enabled:
+        return _disabled_timer
+
+    return _timer(name, labels)
+
+# --------------------------------------------------
+# Snapshot and Merge
+# Worker processes return snapshots, parent merges them
+# --------------------------------------------------
+
+def snapshot(reset: bool = False) -> dict:
+
+    """
+    Returns copy of recorded metrics
+
+    :param reset: Clear registry after copy
+    :type reset: bool
+    :return: Counters, gauges, histograms
+    :rtype: dict
+    """
+
+    with _lock:
+        copy = {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "histograms": {
+                key: {**h, "counts": list(h["counts"])}
+                for key, h in _histograms.items()
+            },
+        }
+
+        if reset:
+            _counters.clear()
+            _gauges.clear()
+            _histograms.clear()
+
+    return copy
+
+def merge(other: dict):
+
+    """
+    Adds snapshot from another process to registry
+    Counters and histograms summed, gauges last-write-wins
+    (aggregates across processes belong in counters, see ratio)
+
+    :param other: Snapshot
+    :type other: dict
+    """
+
+    if not _enabled:
+        return
+
+    with _lock:
+        for key, value in other["counters"].items():
+            _counters[key] = _counters.get(key, 0) + value
+
+        _gauges.update(other["gauges"])
+
+        for key, h in other["histograms"].items():
+            mine = _histograms.get(key)
+
+            if mine is None or mine["buckets"] != h["buckets"]:
+                _histograms[key] = {**h, "counts": list(h["counts"])}
+                continue
+
+            mine["counts"] = [a + b for a, b in zip(mine["counts"], h["counts"])]
+            mine["sum"] += h["sum"]
+            mine["count"] += h["count"]
+
+# --------------------------------------------------
+# Export
+# --------------------------------------------------
+
+def _with_ratios(data: dict) -> dict:
+
+    """
+    Adds registered ratios to snapshot gauges,
+    skipped where the denominator is missing or zero
+    """
+
+    counters = data["counters"]
+    gauges = dict(data["gauges"])
+
+    for name, (numerator, denominator) in _ratios.items():
+        for (counter, labels), value in counters.items():
+            total = counters.get((denominator, labels)) if counter == numerator else None
+
+            if total:
+                gauges[(name, labels)] = value / total
+
+    return {**data, "gauges": gauges}
+
+def _job_labels(labels: tuple, job: str | None) -> tuple:
+    return labels if job is None else (("job", job),) + labels
+
+def to_json_lines(job: str | None = None) -> str:
+
+    """
+    Renders metrics as one JSON object per series
+
+    :param job: Entry point name, added as job label
+    :type job: str | None
+    :return: JSON lines
+    :rtype: str
+    """
+
+    ts = datetime.now(timezone.utc).isoformat()
+    data = _with_ratios(snapshot())
+    lines = []
+
+    for kind in ("counters", "gauges"):
+        for (name, labels), value in sorted(data[kind].items()):
+            lines.append({
+                "ts": ts,
+                "metric": name,
+                "type": kind[:-1],
+                "labels": dict(_job_labels(labels, job)),
+                "value": value,
+            })
+
+    for (name, labels), h in sorted(data["histograms"].items()):
+        lines.append({
+            "ts": ts,
+            "metric": name,
+            "type": "histogram",
+            "labels": dict(_job_labels(labels, job)),
+            "count": h["count"],
+            "sum": h["sum"],
+            "buckets": dict(zip([str(b) for b in h["buckets"]] + ["+Inf"], h["counts"])),
+        })
+
+    return "".join(json.dumps(line) + "\n" for line in lines)
+
+def _escape_label_value(value) -> str:
+
+    """
+    Escapes label value for text exposition format:
+    backslash, double quote and line feed
+    """
+
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _prometheus_labels(labels: tuple, extra: dict | None = None) -> str:
+
+    pairs = list(labels) + list((extra or {}).items())
+
+    if not pairs:
+        return ""
+
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs) + "}"
+
+def to_prometheus(job: str | None = None) -> str:
+
+    """
+    Renders metrics in Prometheus text exposition format
+
+    :param job: Entry point name, added as job label
+    :type job: str | None
+    :return: Textfile content
+    :rtype: str
+    """
+
+    data = _with_ratios(snapshot())
+    lines = []
+    typed = set()
+
+    for kind, prom_type in (("counters", "counter"), ("gauges", "gauge")):
+        for (name, labels), value in sorted(data[kind].items()):
+            labels = _job_labels(labels, job)
+            if name not in typed:
+                lines.append(f"# TYPE {name} {prom_type}")
+                typed.add(name)
+            lines.append(f"{name}{_prometheus_labels(labels)} {value}")
+
+    for (name, labels), h in sorted(data["histograms"].items()):
+        labels = _job_labels(labels, job)
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+
+        cumulative = 0
+
+        for bound, count in zip(list(h["buckets"]) + ["+Inf"], h["counts"]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_prometheus_labels(labels, {'le': bound})} {cumulative}")
+
+        lines.append(f"{name}_sum{_prometheus_labels(labels)} {h['sum']}")
+        lines.append(f"{name}_count{_prometheus_labels(labels)} {h['count']}")
+
+    return "\n".join(lines) + "\n"
+
+def job_path(path: str, job: str | None) -> str:
+
+    """
+    Prometheus textfile per job (metrics.prom -> metrics_job.prom)
+    so entry points sharing METRICS_PATH do not replace each other,
+    JSON lines are appended to path unchanged
+
+    :param path: Output path
+    :type path: str
+    :param job: Entry point name
+    :type job: str | None
+    :return: Output path for job
+    :rtype: str
+    """
+
+    if job is None or path == "-" or metrics_export != "prometheus":
+        return path
+
+    stem, ext = os.path.splitext(path)
+
+    return f"{stem}_{job}{ext}"
+
+def export(path: str = metrics_path, job: str | None = None):
+
+    """
+    Writes metrics for METRICS_EXPORT
+    json -> appends JSON lines to path ("-" for stderr)
+    prometheus -> replaces textfile at path atomically
+
+    :param path: Output path
+    :type path: str
+    :param job: Entry point name, added as job label
+    :type job: str | None
+    """
+
+    if not _enabled:
+        return
+
+    path = job_path(path, job)
+
+    if metrics_export == "prometheus":
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(to_prometheus(job))
+
+        os.replace(tmp_path, path)
+        return
+
+    content = to_json_lines(job)
+
+    if path == "-":
+        sys.stderr.write(content)
+        return
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(content)
+
+_exported_at_exit = False
+
+def export_at_exit(job: str):
+
+    """
+    Registers export at interpreter exit, once per process
+    Called by entry points, not by worker processes
+
+    :param job: Entry point name, added as job label
+    :type job: str
+    """
+
+    global _exported_at_exit
+
+    if _enabled and not _exported_at_exit:
+        atexit.register(export, metrics_path, job)
+        _exported_at_exit = True
@@ -0,0 +1,29 @@
+import os
+from dotenv import load_dotenv
+
+# --------------------------------------------------
+# Load environment variables
+# --------------------------------------------------
+
+load_dotenv()
+
+# --------------------------------------------------
+# Metrics export
+# --------------------------------------------------
+
+metrics_export = os.getenv("METRICS_EXPORT", "off") # off, json or prometheus
+metrics_path = os.getenv(
+    "METRICS_PATH",
+    "metrics.prom" if metrics_export == "prometheus" else "metrics.jsonl"
+)
+
+# --------------------------------------------------
+# Histogram buckets (seconds)
+# --------------------------------------------------
+
+latency_buckets = tuple(
+    float(b) for b in os.getenv(
+        "METRICS_LATENCY_BUCKETS",
+        "0.001,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60"
+    ).split(",")
+)
@@ -0,0 +1,326 @@
+"""
+Output backends for raw events
+S3, local filesystem and in-memory
+All backends share the event_type/event_date=YYYY-MM-DD/ key layout
+QueuedBackend decouples writes from the simulation with upload workers
+"""
+
+import os
+import queue
+import threading
+from src.metrics import metrics
+from src.raw.ingestion.s3config import get_client, get_bucket, raw_sink, raw_local_dir, upload_workers, upload_queue_size
+
+# --------------------------------------------------
+# S3 Backend
+# --------------------------------------------------
+
+class S3Backend:
+
+    def __init__(self, bucket: str | None = None):
+
+        """
+        Initialises S3 backend
+        
+        :param self: References class
+        :param bucket: S3 bucket, defaults to S3_RAW_BUCKET
+        :type bucket: str | None
+        """
+
+        self.bucket = bucket or get_bucket()
+
+    def put(self, key: str, body: bytes):
+
+        """
+        Writes object to S3
+        
+        :param self: References class
+        :param key: Object key
+        :type key: str
+        :param body: Object body
+        :type body: bytes
+        """
+
+        with metrics.timer("raw_put_seconds", backend="s3"):
+            get_client().put_object(
+                Bucket=self.bucket,
+                Key=key,
+                Body=body,
+                ContentType="application/x-ndjson"
+            )
+
+    def flush(self):
+
+        """
+        Writes are synchronous, nothing to flush
+        
+        :param self: References class
+        """
+
+    def close(self):
+
+        """
+        No resources to release
+        
+        :param self: References class
+        """
+
+# --------------------------------------------------
+# Local Filesystem Backend
+# --------------------------------------------------
+
+class LocalBackend:
+
+    def __init__(self, root: str):
+
+        """
+        Initialises local directory backend
+        
+        :param self: References class
+        :param root: Root directory, stands in for bucket
+        :type root: str
+        """
+
+        self.root = root
+
+    def put(self, key: str, body: bytes):
+
+        """
+        Writes object to root/key
+        
+        :param self: References class
+        :param key: Object key
+        :type key: str
+        :param body: Object body
+        :type body: bytes
+        """
+
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with metrics.timer("raw_put_seconds", backend="local"), open(path, "wb") as f:
+            f.write(body)
+
+    def flush(self):
+
+        """
+        Writes are synchronous, nothing to flush
+        
+        :param self: References class
+        """
+
+    def close(self):
+
+        """
+        No resources to release
+        
+        :param self: References class
+        """
+
+# --------------------------------------------------
+# In-Memory Backend
+# --------------------------------------------------
+
+class MemoryBackend:
+
+    def __init__(self):
+
+        """
+        Initialises in-memory backend for tests and benchmarks
+        
+        :param self: References class
+        """
+
+        self.objects = {}
+
+    def put(self, key: str, body: bytes):
+
+        """
+        Stores object body by key
+        
+        :param self: References class
+        :param key: Object key
+        :type key: str
+        :param body: Object body
+        :type body: bytes
+        """
+
+        self.objects[key] = body
+
+    def flush(self):
+
+        """
+        Writes are synchronous, nothing to flush
+        
+        :param self: References class
+        """
+
+    def close(self):
+
+        """
+        No resources to release
+        
+        :param self: References class
+        """
+
+# --------------------------------------------------
+# Queued Backend
+# --------------------------------------------------
+
+class QueuedBackend:
+
+    def __init__(self, backend, workers: int, max_queue: int):
+
+        """
+        Wraps backend with bounded queue drained by upload threads
+        put blocks when queue is full (backpressure)
+        
+        :param self: References class
+        :param backend: Wrapped backend
+        :param workers: Number of upload threads
+        :type workers: int
+        :param max_queue: Maximum queued objects
+        :type max_queue: int
+        """
+
+        self.backend = backend
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.threads = []
+        self.lock = threading.Lock()
+        self.failures = []
+        self.objects_written = 0
+        self.bytes_written = 0
+
+    def start(self):
+
+        """
+        Starts upload threads
+        
+        :param self: References class
+        """
+
+        self.threads = [
+            threading.Thread(target=self.drain, daemon=True)
+            for _ in range(self.workers)
+        ]
+
+        for t in self.threads:
+            t.start()
+
+    def put(self, key: str, body: bytes):
+
+        """
+        Queues object for upload, starts workers on first use
+        
+        :param self: References class
+        :param key: Object key
+        :type key: str
+        :param body: Object body
+        :type body: bytes
+        """
+
+        if not self.threads:
+            self.start()
+
+        self.queue.put((key, body))
+
+    def drain(self):
+
+        """
+        Upload worker loop, stops on None
+        Failures are recorded and reported by flush
+        
+        :param self: References class
+        """
+
+        while True:
+            item = self.queue.get()
+
+            try:
+                if item is None:
+                    return
+
+                key, body = item
+
+                try:
+                    self.backend.put(key, body)
+                except Exception as e:
+                    metrics.inc("raw_put_failures_total")
+                    with self.lock:
+                        self.failures.append((key, e))
+                else:
+                    with self.lock:
+                        self.objects_written += 1
+                        self.bytes_written += len(body)
+
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+
+        """
+        Waits for queued uploads
+        Raises if any upload failed
+        
+        :param self: References class
+        """
+
+        self.queue.join()
+
+        with self.lock:
+            failures, self.failures = self.failures, []
+
+        if failures:
+            key, error = failures[0]
+            raise RuntimeError(
+                f"{len(failures)} uploads failed, first {key}: {error}"
+            )
+
+    def close(self):
+
+        """
+        Drains queue and stops upload threads
+        
+        :param self: References class
+        """
+
+        for _ in self.threads:
+            self.queue.put(None)
+
+        for t in self.threads:
+            t.join()
+
+        self.threads = []
+        self.flush()
+
+# --------------------------------------------------
+# Backend Factory
+# --------------------------------------------------
+
+def get_backend(name: str | None = None):
+
+    """
+    Returns backend for name, defaults to RAW_SINK
+    S3 and local backends queued when RAW_UPLOAD_WORKERS > 0
+    
+    :param name: s3 || local || memory
+    :type name: str | None
+    :return: Backend instance
+    """
+
+    name = name or raw_sink
+
+    if name == "s3":
+        backend = S3Backend()
+    elif name == "local":
+        backend = LocalBackend(raw_local_dir)
+    elif name == "memory":
+        return MemoryBackend()
+    else:
+        raise ValueError(f"Unknown raw sink: {name}")
+
+    if upload_workers > 0:
+        return QueuedBackend(backend, upload_workers, upload_queue_size)
+
+    return backend
@@ -0,0 +1,335 @@
+"""
+Direct-to-columnar generator sink
+Events appended to per staging event type column buffers
+matching staging/schemas.py, no JSON round trip
+Row groups written straight to the staging dataset layout
+Month partitions written and closed once the simulation
+moves past them, files readable without waiting for the run to end
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import quote
+import pyarrow as pa
+import pyarrow.parquet as pap
+from pyarrow.fs import FileSystem, FileSelector
+from src.raw.ingestion.s3config import columnar_close_grace_days
+from src.staging.schemas import encounter_schema, waiting_schema, department_schema
+from src.staging.staging_config import staging_bucket, row_group_size, max_rows_per_file, partition_by_ward
+from src.staging.staging_utils import WARD_COLUMNS, get_filesystem, normalise_timestamps, staging_output_dir
+
+# --------------------------------------------------
+# Staging Event Types
+# --------------------------------------------------
+
+STAGING_SCHEMAS = {
+    "admission": encounter_schema,
+    "discharge": encounter_schema,
+    "waiting_list_snapshot": waiting_schema,
+    "department_snapshot": department_schema,
+}
+
+# --------------------------------------------------
+# Columnar Sink
+# --------------------------------------------------
+
+class ColumnarSink:
+
+    def __init__(
+            self,
+            bucket: str = staging_bucket,
+            fs: FileSystem | None = None,
+            tags: dict | None = None,
+            row_group_size: int = row_group_size,
+            max_rows_per_file: int = max_rows_per_file,
+            by_ward: bool = partition_by_ward,
+            close_grace_days: int = columnar_close_grace_days
+            ):
+
+        """
+        Initialises columnar sink
+        Drop-in for BufferedSink (write/flush/close)
+        One writer per staging partition (year/month, optionally ward),
+        files named {event_type}_columnar[_tags]-{i}.parquet
+        so JSON staging rebuilds of a partition replace them,
+        files of a previous run with the same tags removed on first write
+        Simulation date tracked from admissions and snapshots,
+        a month is written and its files closed once that date is
+        close_grace_days past month end; discharges are dated ahead
+        of the simulation, their months stay open until then
+        close() must be called to finalise remaining Parquet files
+
+        :param self: References class
+        :param bucket: Staging bucket
+        :type bucket: str
+        :param fs: Filesystem, defaults to shared staging filesystem
+        :type fs: FileSystem | None
+        :param tags: Tags (e.g. site, replica) added to file names
+        :type tags: dict | None
+        :param row_group_size: Rows buffered per partition before write
+        :type row_group_size: int
+        :param max_rows_per_file: Rows per file before rolling to next file
+        :type max_rows_per_file: int
+        :param by_ward: Partition by ward below month
+        :type by_ward: bool
+        :param close_grace_days: Days past month end before its files close
+        :type close_grace_days: int
+        """
+
+        self.bucket = bucket
+        self.fs = fs or get_filesystem()
+        self.part = "columnar" + "".join(f"_{k}-{v}" for k, v in (tags or {}).items())
+        self.row_group_size = row_group_size
+        self.max_rows_per_file = max_rows_per_file
+        self.by_ward = by_ward
+        self.close_grace = timedelta(days=close_grace_days)
+        self.buffers = {}
+        self.writers = {}
+        self.months = defaultdict(set) # (year, month) -> open keys
+        self.next_index = {} # closed key -> next file index
+        self.cleaned = set()
+        self.sim_day = ""
+        self.rows_written = defaultdict(int)
+        self.events_written = 0
+
+    def write(self, payload: dict):
+
+        """
+        Appends event to column buffers of its staging partition
+        Department snapshots exploded to one row per ward
+
+        :param self: References class
+        :param payload: Payload data
+        :type payload: dict
+        """
+
+        event_type = payload["event_type"]
+        event_ts = payload["event_ts"]
+        self.events_written += 1
+
+        if event_type in ("admission", "discharge"):
+            patient = payload["patient"]
+            encounter = payload["encounter"]
+            self.append(event_type, event_ts, {
+                "event_type": event_type,
+                "patient_id": patient["patient_id"],
+                "patient_gender": patient["gender"],
+                "department_name": encounter["department"],
+                "waiting_list": encounter["waiting_list"],
+                "waiting_time": encounter["waiting_time"],
+                "event_ts": event_ts,
+                "source_system": payload["source_system"],
+            })
+
+        elif event_type == "wait_snapshot":
+            self.append("waiting_list_snapshot", event_ts, {
+                "event_type": event_type,
+                "waiting_count": payload["waiting_count"],
+                "phase": payload["phase"],
+                "event_ts": event_ts,
+                "source_system": payload["source_system"],
+            })
+
+        elif event_type == "dep_snapshot":
+            for ward in payload["departments"].values():
+                self.append("department_snapshot", event_ts, {
+                    "event_type": event_type,
+                    "ward_name": ward["name"],
+                    "beds_total": ward["beds_total"],
+                    "beds_occupied": ward["beds_occupied"],
+                    "beds_available": ward["beds_available"],
+                    "phase": payload["phase"],
+                    "event_ts": event_ts,
+                    "source_system": payload["source_system"],
+                })
+
+        else:
+            raise ValueError(f"No staging schema for event type {event_type}")
+
+        if event_type != "discharge" and event_ts[:10] > self.sim_day:
+            self.advance(event_ts[:10])
+
+    def advance(self, sim_day: str):
+
+        """
+        Moves simulation date forward, writes and closes
+        every month ended at least close_grace_days before it
+        A late row for a closed month opens that partition's next file
+
+        :param self: References class
+        :param sim_day: Simulation date YYYY-MM-DD
+        :type sim_day: str
+        """
+
+        self.sim_day = sim_day
+        current = date.fromisoformat(sim_day)
+
+        for year, month in sorted(self.months):
+
+            next_month = date(year + month // 12, month % 12 + 1, 1)
+
+            if next_month + self.close_grace > current:
+                break
+
+            for key in self.months.pop((year, month)):
+                self.close_partition(key)
+
+    def close_partition(self, key: tuple[str, str]):
+
+        """
+        Writes partition buffer and closes its file
+
+        :param self: References class
+        :param key: (event_type, partition)
+        :type key: tuple[str, str]
+        """
+
+        self.write_buffer(key)
+        entry = self.writers.pop(key, None)
+
+        if entry is not None:
+            entry["writer"].close()
+            self.next_index[key] = entry["index"] + 1
+
+    def append(self, event_type: str, event_ts: str, row: dict):
+
+        """
+        Appends row to partition buffer, writes row group when full
+        Partition taken from ISO event_ts (UTC) without parsing
+
+        :param self: References class
+        :param event_type: Staging event type
+        :type event_type: str
+        :param event_ts: ISO-8601 UTC event timestamp
+        :type event_ts: str
+        :param row: Column values
+        :type row: dict
+        """
+
+        year, month = int(event_ts[:4]), int(event_ts[5:7])
+        partition = f"year={year}/month={month}"
+
+        if self.by_ward:
+            for column in WARD_COLUMNS:
+                if column in row:
+                    partition += f"/{column}={quote(row[column], safe='')}"
+
+        key = (event_type, partition)
+        columns = self.buffers.get(key)
+
+        if columns is None:
+            columns = self.buffers[key] = {name: [] for name in row}
+            self.months[(year, month)].add(key)
+
+        for name, value in row.items():
+            columns[name].append(value)
+
+        if len(columns["event_ts"]) >= self.row_group_size:
+            self.write_buffer(key)
+
+    def write_buffer(self, key: tuple[str, str]):
+
+        """
+        Converts partition buffer to staged table,
+        writes it as a row group, rolls file at max_rows_per_file
+
+        :param self: References class
+        :param key: (event_type, partition)
+        :type key: tuple[str, str]
+        """
+
+        columns = self.buffers.pop(key, None)
+
+        if not columns:
+            return
+
+        event_type, partition = key
+        schema = STAGING_SCHEMAS[event_type]
+
+        if self.by_ward:
+            schema = pa.schema([f for f in schema if f.name not in WARD_COLUMNS])
+            columns = {name: values for name, values in columns.items() if name in schema.names}
+
+        table = pa.table(columns)
+        table = table.append_column(
+            "ingestion_ts",
+            pa.array([datetime.now(timezone.utc).isoformat()] * table.num_rows)
+        )
+        table = normalise_timestamps(table, ("event_ts", "ingestion_ts"))
+        table = table.select(schema.names).cast(schema)
+
+        entry = self.writers.get(key)
+
+        if entry is not None and entry["rows"] + table.num_rows > self.max_rows_per_file:
+            entry["writer"].close()
+            entry = {"index": entry["index"] + 1, "rows": 0, "writer": None}
+
+        if entry is None:
+            entry = {"index": self.next_index.pop(key, 0), "rows": 0, "writer": None}
+
+        if entry["writer"] is None:
+            directory = f"{staging_output_dir(self.bucket, event_type)}/{partition}"
+            self.fs.create_dir(directory, recursive=True)
+
+            if key not in self.cleaned:
+                self.remove_stale(directory, event_type)
+                self.cleaned.add(key)
+            entry["writer"] = pap.ParquetWriter(
+                f"{directory}/{event_type}_{self.part}-{entry['index']}.parquet",
+                schema,
+                filesystem=self.fs,
+                compression="snappy",
+                use_dictionary=True
+            )
+
+        entry["writer"].write_table(table, row_group_size=table.num_rows)
+        entry["rows"] += table.num_rows
+        self.writers[key] = entry
+        self.rows_written[event_type] += table.num_rows
+
+    def remove_stale(self, directory: str, event_type: str):
+
+        """
+        Removes files a previous run with the same tags left in partition,
+        a shorter rerun would otherwise keep its higher-index files
+
+        :param self: References class
+        :param directory: Partition directory
+        :type directory: str
+        :param event_type: Staging event type
+        :type event_type: str
+        """
+
+        prefix = f"{event_type}_{self.part}-"
+
+        for f in self.fs.get_file_info(FileSelector(directory, allow_not_found=True)):
+            if f.base_name.startswith(prefix) and f.base_name.endswith(".parquet"):
+                self.fs.delete_file(f.path)
+
+    def flush(self):
+
+        """
+        Writes all buffered rows as row groups
+        Files stay open for further row groups until close
+
+        :param self: References class
+        """
+
+        for key in list(self.buffers):
+            self.write_buffer(key)
+
+    def close(self):
+
+        """
+        Writes buffered rows and finalises Parquet files
+
+        :param self: References class
+        """
+
+        self.flush()
+
+        for entry in self.writers.values():
+            entry["writer"].close()
+
+        self.writers.clear()
+        self.months.clear()
@@ -1,39 +1,252 @@
 """
-Writes generator data to S3 bucket
+Writes generator data to configured backend (S3, local, memory)
+Events buffered per event type/date, flushed as NDJSON objects
+when a size threshold is hit or the simulation moves past the day
 """
 
+import atexit
 import json
 import uuid
-from datetime import datetime, timezone
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
 from src.raw.source_gen.source_gen_utils import date_from_timestamp
-from src.raw.ingestion.s3config import client, s3_bucket
+from src.raw.ingestion.s3config import raw_sink, sink_max_events, sink_max_bytes, sink_flush_grace_days
+from src.raw.ingestion.backends import get_backend
+from src.metrics import metrics
+
+# --------------------------------------------------
+# Buffered Sink
+# --------------------------------------------------
+
+class BufferedSink:
+
+    def __init__(
+            self,
+            backend,
+            max_events: int,
+            max_bytes: int,
+            tags: dict | None = None,
+            flush_grace_days: int = sink_flush_grace_days
+            ):
+
+        """
+        Initialises buffered sink
+        Tags (e.g. site, replica) are added to every payload
+        and to the key path below the event_date partition
+        Simulation date tracked from admissions and snapshots,
+        a day's prefixes flushed once that date is flush_grace_days
+        past it; discharges are dated ahead of the simulation,
+        their days stay buffered until then
+        
+        :param self: References class
+        :param backend: Output backend with put(key, body)
+        :param max_events: Events per prefix before flush
+        :type max_events: int
+        :param max_bytes: Bytes per prefix before flush
+        :type max_bytes: int
+        :param tags: Payload/key tags, optional
+        :type tags: dict | None
+        :param flush_grace_days: Days past event_date before its prefixes flush
+        :type flush_grace_days: int
+        """
+
+        self.backend = backend
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.tags = tags or {}
+        self.tag_path = "".join(f"{k}={v}/" for k, v in self.tags.items())
+        self.buffers = defaultdict(list)
+        self.buffer_bytes = defaultdict(int)
+        self.flush_grace = timedelta(days=flush_grace_days)
+        self.dates = defaultdict(set) # event_date -> buffered prefixes
+        self.sim_day = ""
+        self.events_written = 0
+
+    def write(self, payload: dict):
+
+        """
+        Adds event to buffer for event_type/event_date prefix
+        Flushes prefix when count or size threshold is hit,
+        flushes past days when the simulation date moves on
+        
+        :param self: References class
+        :param payload: Payload data
+        :type payload: dict
+        """
+
+        ingestion_ts = str(datetime.now(timezone.utc))
+        event_ts = str(datetime.fromisoformat(payload["event_ts"]))
+        event_date = str(date_from_timestamp(event_ts))
+        event_type = payload["event_type"]
+        payload["ingestion_ts"] = ingestion_ts
+        payload.update(self.tags)
+
+        prefix = f"{event_type}/event_date={event_date}"
+        line = json.dumps(payload).encode("utf-8")
+
+        if prefix not in self.buffers:
+            self.dates[event_date].add(prefix)
+
+        self.buffers[prefix].append(line)
+        self.buffer_bytes[prefix] += len(line) + 1
+        self.events_written += 1
+
+        if (
+            len(self.buffers[prefix]) >= self.max_events
+            or self.buffer_bytes[prefix] >= self.max_bytes
+        ):
+            self.flush_prefix(prefix)
+
+        if event_type != "discharge" and event_date > self.sim_day:
+            self.advance(event_date)
+
+    def advance(self, sim_day: str):
+
+        """
+        Moves simulation date forward, flushes prefixes of every
+        day at least flush_grace_days before it
+        A late event for a flushed day starts a new object
+
+        :param self: References class
+        :param sim_day: Simulation date YYYY-MM-DD
+        :type sim_day: str
+        """
+
+        self.sim_day = sim_day
+        cutoff = (date.fromisoformat(sim_day) - self.flush_grace).isoformat()
+
+        for event_date in sorted(self.dates):
+
+            if event_date >= cutoff:
+                break
+
+            for prefix in self.dates.pop(event_date):
+                self.flush_prefix(prefix)
+
+    def flush_prefix(self, prefix: str):
+
+        """
+        Writes buffered events for prefix as one NDJSON object
+        
+        :param self: References class
+        :param prefix: event_type/event_date=YYYY-MM-DD
+        :type prefix: str
+        """
+
+        lines = self.buffers.pop(prefix, None)
+        self.buffer_bytes.pop(prefix, None)
+
+        if not lines:
+            return
+
+        event_type = prefix.split("/")[0]
+
+        key = (
+            f"{prefix}/{self.tag_path}{event_type}_{uuid.uuid4().hex}.json"
+        )
+
+        body = b"\n".join(lines) + b"\n"
+        self.backend.put(key, body)
+
+        metrics.inc("raw_objects_total", event_type=event_type)
+        metrics.inc("raw_bytes_total", len(body), event_type=event_type)
+
+    def flush(self):
+
+        """
+        Flushes all buffered prefixes
+        Waits for backend to finish writing
+        
+        :param self: References class
+        """
+
+        for prefix in list(self.buffers):
+            self.flush_prefix(prefix)
+
+        self.dates.clear()
+        self.backend.flush()
+
+    def close(self):
+
+        """
+        Flushes buffers and releases backend
+        
+        :param self: References class
+        """
+
+        for prefix in list(self.buffers):
+            self.flush_prefix(prefix)
+
+        self.dates.clear()
+        self.backend.close()
+
+# --------------------------------------------------
+# Default Sink
+# --------------------------------------------------
+
+def new_sink(tags: dict | None = None):
+
+    """
+    Creates sink for RAW_SINK
+    columnar -> ColumnarSink writing staging Parquet directly,
+    otherwise BufferedSink over RAW_SINK backend
+    
+    :param tags: Payload/key tags, optional
+    :type tags: dict | None
+    :return: Sink
+    """
+
+    if raw_sink == "columnar":
+        from src.raw.ingestion.columnar_write import ColumnarSink
+        return ColumnarSink(tags=tags)
+
+    return BufferedSink(get_backend(), sink_max_events, sink_max_bytes, tags)
+
+_sink = None
+
+def get_sink() -> BufferedSink:
+
+    """
+    Returns default sink for RAW_SINK
+    Created on first use, closed at exit
+    
+    :return: Sink
+    :rtype: BufferedSink
+    """
+
+    global _sink
+
+    if _sink is None:
+        _sink = new_sink()
+        atexit.register(_sink.close)
+
+    return _sink
 
 # --------------------------------------------------
 # Write Encounter to S3
 # --------------------------------------------------
 
-def write_to_bucket(payload: dict):
+def write_to_bucket(payload: dict, sink: BufferedSink | None = None):
 
     """
-    Writes event to S3
+    Writes event to buffered sink
     
     :param payload: Payload data
     :type payload: dict
+    :param sink: Sink, defaults to configured sink
+    :type sink: BufferedSink | None
     """
 
-    ingestion_ts = str(datetime.now(timezone.utc))
-    event_ts = str(datetime.fromisoformat(payload["event_ts"]))
-    event_date = str(date_from_timestamp(event_ts))
-    event_type = payload["event_type"]
-    payload["ingestion_ts"] = ingestion_ts
+    metrics.inc("raw_events_total", event_type=payload["event_type"])
+    (sink or get_sink()).write(payload)
+
+def flush_bucket(sink: BufferedSink | None = None):
 
-    key = (
-        f"{event_type}/event_date={event_date}/{event_type}_{uuid.uuid4().hex}.json"
-    )
+    """
+    Flushes all buffered events to backend
+    
+    :param sink: Sink, defaults to configured sink
+    :type sink: BufferedSink | None
+    """
 
-    client.put_object(
-        Bucket=s3_bucket,
-        Key=key,
-        Body=json.dumps(payload).encode("utf-8"),
-        ContentType="application/json"
-    )
\ No newline at end of file
+    (sink or get_sink()).flush()
@@ -1,5 +1,5 @@
 import os
-import boto3
+import threading
 from dotenv import load_dotenv
 
 # --------------------------------------------------
@@ -12,17 +12,69 @@ load_dotenv()
 # AWS config
 # --------------------------------------------------
 
-s3_bucket = os.getenv("S3_RAW_BUCKET")
+aws_region = os.getenv("AWS_REGION")
+s3_endpoint_url = os.getenv("S3_ENDPOINT_URL") # S3-compatible stand-in, unset = AWS
 
-if not s3_bucket:
-    raise RuntimeError("S3 bucket not set in environment")
+_client = None
+_client_lock = threading.Lock()
 
-aws_region = os.getenv("AWS_REGION")
+def get_bucket() -> str:
+
+    """
+    Returns raw S3 bucket from environment
+    
+    :return: Bucket name
+    :rtype: str
+    """
+
+    s3_bucket = os.getenv("S3_RAW_BUCKET")
 
-client = boto3.client(
-    "s3",
-    region_name=aws_region
-)
+    if not s3_bucket:
+        raise RuntimeError("S3 bucket not set in environment")
+
+    return s3_bucket
+
+def get_client():
+
+    """
+    Returns shared boto3 S3 client
+    Created on first use so local sinks run without AWS
+    Connection pool sized for upload workers, client is thread-safe
+    
+    :return: boto3 S3 client
+    """
+
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            import boto3
+            from botocore.config import Config
+
+            _client = boto3.client(
+                "s3",
+                region_name=aws_region,
+                endpoint_url=s3_endpoint_url,
+                config=Config(max_pool_connections=max(10, upload_workers))
+            )
+
+    return _client
+
+# --------------------------------------------------
+# Sink config
+# --------------------------------------------------
+
+raw_sink = os.getenv("RAW_SINK", "s3") # s3, local, memory or columnar (staging Parquet)
+raw_local_dir = os.getenv("RAW_LOCAL_DIR", "data/raw")
+
+sink_max_events = int(os.getenv("SINK_MAX_EVENTS", "1000"))
+sink_max_bytes = int(os.getenv("SINK_MAX_BYTES", str(5 * 1024 * 1024)))
+sink_flush_grace_days = int(os.getenv("SINK_FLUSH_GRACE_DAYS", "1")) # days past event_date before its prefixes flush
+
+upload_workers = int(os.getenv("RAW_UPLOAD_WORKERS", "8"))
+upload_queue_size = int(os.getenv("RAW_UPLOAD_QUEUE_SIZE", "64"))
+
+columnar_close_grace_days = int(os.getenv("COLUMNAR_CLOSE_GRACE_DAYS", "1")) # days past month end before its files close
 
 # --------------------------------------------------
 # S3 helpers
@@ -41,6 +93,8 @@ def s3_key_exists(bucket: str, key: str) -> bool:
     :rtype: bool
     """
 
+    client = get_client()
+
     try:
         client.head_object(Bucket=bucket, Key=key)
         return True
@@ -48,4 +102,4 @@ def s3_key_exists(bucket: str, key: str) -> bool:
     except client.exceptions.ClientError as e:
         if e.response["Error"]["Code"] == "404":
             return False
-        raise
\ No newline at end of file
+        raise
@@ -4,76 +4,49 @@ Coordinates admissions, discharges, waiting list, snapshots
 
 import numpy as np
 import random
-from datetime import timedelta
+from datetime import date, datetime, time, timedelta, timezone
+from time import perf_counter
 import src.raw.source_gen.encounter as enc
 from src.raw.source_gen.department import Department
 from src.raw.source_gen.waiting_list import WaitingList
-from src.raw.ingestion.s3_write import write_to_bucket
-from src.raw.source_gen.source_gen_utils import *
+from src.raw.source_gen.discharge_scheduler import DischargeScheduler
+from src.raw.source_gen.sampling import Sampler
+from src.raw.ingestion.s3_write import write_to_bucket, flush_bucket
+from src.metrics import metrics
+from src.raw.source_gen.source_gen_utils import validate_queue_dynamics
 from src.raw.source_gen.patient_registry import PatientRegistry
-from src.raw.source_gen.constants import PRESSURE_MULTIPLIER, DAILY_ADMISSION_BASELINE, PATIENT_REGISTRY_MAX, DEPARTMENT_CONFIG
+from src.raw.source_gen.patient_store import CompactPatientRegistry
+from src.raw.source_gen.constants import DAILY_ADMISSION_BASELINE, PATIENT_ID_START, PATIENT_REGISTRY_MAX, COMPACT_PATIENT_STORE, DEPARTMENT_CONFIG
 
 # --------------------------------------------------
 # Discharges
 # --------------------------------------------------
 
-def process_discharges(active_admissions: list, current_date: date) -> list:
+def process_discharges(scheduler: DischargeScheduler, current_date: date) -> int:
 
     """
-    Receives list of active admissions,
-    returns filtered list of active admissions
+    Discharges active admissions due on or before current date
+    Cost proportional to number of discharges, not occupancy
     
-    :param active_admissions: List of active admissions
-    :type active_admissions: list
+    :param scheduler: Discharge scheduler of active admissions
+    :type scheduler: DischargeScheduler
     :param current_date: Current date
     :type current_date: date
-    """
-
-    remaining = []
-
-    for entry in active_admissions:
-        discharge_date = entry["discharge_date"]
-
-        if discharge_date is not None and discharge_date <= current_date:
-            entry["department"].discharge()
-        else:
-            remaining.append(entry)
-
-    return remaining
-
-# --------------------------------------------------
-# Daily Admissions
-# --------------------------------------------------
-
-def admissions_for_day(date: date, baseline: int) -> int:
-
-    """
-    Calculates number of admissions for day
-    and poisson mean determined by monthly pressure multiplier
-    
-    :param date: Current date
-    :type date: date
-    :param baseline: Baseline admissions constant
-    :type baseline: int
-    :return: Poisson adjusted admissions
+    :return: Number of discharges
     :rtype: int
     """
 
-    month = date.month
-    multiplier = PRESSURE_MULTIPLIER[month]
-    mean = baseline * multiplier
-
-    return np.random.poisson(mean)
+    return scheduler.discharge_due(current_date)
 
 # --------------------------------------------------
 # Department Snapshot
 # --------------------------------------------------
 
-def department_snapshot(ts: str, departments: dict, phase: str):
+def department_snapshot(ts: str, departments: dict, phase: str, sink=None):
 
     """
     Generates department snapshot
-    Writes to S3
+    Writes to sink
     
     :param ts: Snapshot timestamp
     :type ts: datetime
@@ -81,6 +54,7 @@ def department_snapshot(ts: str, departments: dict, phase: str):
     :type departments: dict
     :param phase: Start Of Day/End Of Day
     :type phase: str
+    :param sink: Output sink, defaults to configured sink
     """
 
     snapshot = {
@@ -94,13 +68,13 @@ def department_snapshot(ts: str, departments: dict, phase: str):
         "source_system": "department",
     }
 
-    write_to_bucket(snapshot)
+    write_to_bucket(snapshot, sink)
 
 # --------------------------------------------------
 # Snapshots - Wait List/Departments
 # --------------------------------------------------
 
-def create_snapshots(ts: datetime, phase: str, waitinglist: WaitingList, departments: dict):
+def create_snapshots(ts: datetime, phase: str, waitinglist: WaitingList, departments: dict, sink=None):
 
     """
     Helper function to aggregate snapshot creation
@@ -113,18 +87,26 @@ def create_snapshots(ts: datetime, phase: str, waitinglist: WaitingList, departm
     :type waitinglist: WaitingList
     :param departments: Department data
     :type departments: dict
+    :param sink: Output sink, defaults to configured sink
     """
 
     ts_string = str(ts.isoformat())
-    waitinglist.waiting_list_snapshot(ts_string, phase)
-    department_snapshot(ts_string, departments, phase)
+    waitinglist.waiting_list_snapshot(ts_string, phase, sink)
+    department_snapshot(ts_string, departments, phase, sink)
 
 
 # --------------------------------------------------
 # Admission/Discharge/Waiting List Coordinator
 # --------------------------------------------------
 
-def generate_admissions():
+def generate_admissions(
+        sink=None,
+        seed: int | None = None,
+        patient_ids: range | None = None,
+        start: date = date(2025, 1, 28),
+        end: date = date(2027, 1, 28),
+        compact_registry: bool = COMPACT_PATIENT_STORE
+        ):
 
     """
     Coordinate admissions, discharges, waiting list
@@ -132,14 +114,42 @@ def generate_admissions():
     Creates daily snapshot of number of patients on waiting list
     Daily discharges prioritised, followed by patients in waiting list
     Selects each day in range, creates number of admissions for the day
+    Arrivals, timestamps and lengths of stay pre-sampled by Sampler
     Creates timestamp for admission and discharge json
     Calls generator functions to create json for S3
     Breaks inner loop if no patient is admittable or department has capacity
+    Flushes buffered events to sink at end of run
+    Records per-day and run wall time when metrics are enabled
+    All randomness drawn from generators seeded by seed,
+    runs are reproducible for a given seed
+    
+    :param sink: Output sink, defaults to sink for RAW_SINK backend
+    :param seed: Simulation seed, None for fresh entropy
+    :type seed: int | None
+    :param patient_ids: Patient identifiers, defaults to PATIENT_ID_START..PATIENT_REGISTRY_MAX
+    :type patient_ids: range | None
+    :param start: First simulated date
+    :type start: date
+    :param end: Last simulated date
+    :type end: date
+    :param compact_registry: Use NumPy-backed CompactPatientRegistry
+    :type compact_registry: bool
     """
 
-    registry = PatientRegistry(range(10000, PATIENT_REGISTRY_MAX))
+    # Independent child streams, stdlib and NumPy draws never correlated
+    py_seq, np_seq = np.random.SeedSequence(seed).spawn(2)
+    rng = random.Random(int(py_seq.generate_state(1)[0]))
+    np_rng = np.random.default_rng(np_seq)
+
+    if patient_ids is None:
+        patient_ids = range(PATIENT_ID_START, PATIENT_REGISTRY_MAX)
+
+    if compact_registry:
+        registry = CompactPatientRegistry(patient_ids, rng, np_rng)
+    else:
+        registry = PatientRegistry(patient_ids, rng)
     waitinglist = WaitingList()
-    active_admissions = []
+    scheduler = DischargeScheduler()
     wait_times = []
 
     departments = {
@@ -152,20 +162,22 @@ def generate_admissions():
         for d in DEPARTMENT_CONFIG
     }
 
-    start = date(2025, 1, 28)
-    end = date(2027, 1, 28)
     current_date = start
 
+    sampler = Sampler(start, end, DAILY_ADMISSION_BASELINE, np_rng)
+    run_started = perf_counter()
+
     while current_date <= end:
 
-        current_date_ts = create_timestamp(current_date)
+        day_started = perf_counter()
+        current_date_ts = datetime.combine(current_date, time(), tzinfo=timezone.utc)
         sod_ts = current_date_ts.replace(hour=0, minute=0, second=1)
-        create_snapshots(sod_ts, "SOD", waitinglist, departments)
+        create_snapshots(sod_ts, "SOD", waitinglist, departments, sink)
 
         if current_date.weekday() < 5: #M-F only
-            active_admissions = process_discharges(active_admissions, current_date)
+            process_discharges(scheduler, current_date)
 
-        admissions_per_day = admissions_for_day(current_date, DAILY_ADMISSION_BASELINE)
+        admissions_per_day = sampler.arrivals(current_date)
 
         created_admissions = 0
 
@@ -197,31 +209,24 @@ def generate_admissions():
                 request_date = current_date
                 patient.waiting_time = 0
 
-            dep = random.choice(dep_with_capacity)
+            dep = rng.choice(dep_with_capacity)
             dep.admit()
 
-            los_days = dep.generate_length_of_stay()
+            los_days = dep.generate_length_of_stay(sampler)
 
-            admit_ts = create_timestamp(current_date)
+            admit_ts = sampler.timestamp(current_date)
 
-            discharge_time = random_time_between(8, 22)
-            discharge_date = admit_ts + timedelta(
-                days=los_days
-            )
-            discharge_ts = datetime.combine(
-                discharge_date.date(),
-                discharge_time,
-                tzinfo=admit_ts.tzinfo
+            discharge_ts = sampler.timestamp_between(
+                current_date + timedelta(days=los_days),
+                8,
+                22
             )
 
             patient.admission_date = current_date
-            patient.discharge_date = date_from_timestamp(discharge_ts)
+            patient.discharge_date = discharge_ts.date()
+            registry.record_admission(patient)
 
-            active_admissions.append({
-                "patient": patient,
-                "department": dep,
-                "discharge_date": patient.discharge_date
-            })
+            scheduler.schedule(patient, dep, patient.discharge_date)
 
             created_admissions += 1
 
@@ -232,7 +237,8 @@ def generate_admissions():
                 "admission", 
                 dep.name, 
                 patient.waiting_list,
-                patient.waiting_time
+                patient.waiting_time,
+                sink=sink
             )
 
             enc.generate_encounter_event(
@@ -240,11 +246,19 @@ def generate_admissions():
                 patient.patient_id, 
                 patient.gender, 
                 "discharge", 
-                dep.name
+                dep.name,
+                sink=sink
             )
 
         eod_ts = current_date_ts.replace(hour=23, minute=59, second=59)
-        create_snapshots(eod_ts, "EOD", waitinglist, departments)
+        create_snapshots(eod_ts, "EOD", waitinglist, departments, sink)
         current_date += timedelta(days=1)
 
+        metrics.observe("generate_day_seconds", perf_counter() - day_started)
+        metrics.inc("generate_days_total")
+
+    with metrics.timer("raw_flush_seconds"):
+        flush_bucket(sink)
+
+    metrics.observe("stage_seconds", perf_counter() - run_started, stage="generate_admissions")
     validate_queue_dynamics(wait_times)
\ No newline at end of file
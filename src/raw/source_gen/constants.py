@@ -2,7 +2,9 @@ LAB_TEST_PATH = "src/raw/source/lab_tests.json"
 
 DAILY_ADMISSION_BASELINE = 20
 
+PATIENT_ID_START = 10000
 PATIENT_REGISTRY_MAX = 15000
+COMPACT_PATIENT_STORE = False # NumPy-backed registry for large populations
 
 DEPARTMENT_MIN_STAY = 1
 DEPARTMENT_MAX_STAY = 14
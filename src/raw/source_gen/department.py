@@ -4,8 +4,6 @@ Coordinates creation of departments
 Manages state of each department
 """
 
-import random
-
 # --------------------------------------------------
 # Department Class
 # --------------------------------------------------
@@ -78,27 +76,20 @@ class Department:
         if self.beds_occupied > 0:
             self.beds_occupied -= 1
 
-    def generate_length_of_stay(self) -> int:
+    def generate_length_of_stay(self, sampler) -> int:
 
         """
         Generates length of stay for patient in days
         Adjusts length of stay to create long-stay and bed block patients
+        Drawn from the seeded sampler (see Sampler.length_of_stay)
         
         :param self: References class
+        :param sampler: Sampler class
         :return: Length of stay in days
         :rtype: int
         """
 
-        r = random.random()
-        
-        if r <= 0.9:
-            days = random.randint(self.stay_min, self.stay_max)
-        elif r < 0.98:
-            days = random.randint(15, 30)
-        else:
-            days = random.randint(31, 90)
-
-        return days
+        return sampler.length_of_stay(self.stay_min, self.stay_max)
     
     def to_dict(self) -> dict:
 
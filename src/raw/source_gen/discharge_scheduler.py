@@ -0,0 +1,81 @@
+"""
+Discharge Scheduler Class
+Min-heap of active stays keyed on discharge date
+Pops only stays that are due
+"""
+
+import heapq
+from datetime import date
+from src.raw.source_gen.department import Department
+
+# --------------------------------------------------
+# Discharge Scheduler Class
+# --------------------------------------------------
+
+class DischargeScheduler:
+
+    def __init__(self):
+
+        """
+        Initialise heap of (discharge_date, sequence, patient, department)
+        Sequence keeps heap ordering stable for equal dates
+        
+        :param self: References class
+        """
+
+        self.heap = []
+        self.sequence = 0
+
+    def schedule(self, patient, department: Department, discharge_date: date | None):
+
+        """
+        Schedules stay for discharge
+        Stays without discharge date are never discharged
+        
+        :param self: References class
+        :param patient: Patient class
+        :param department: Admitting department
+        :type department: Department
+        :param discharge_date: Planned discharge date
+        :type discharge_date: date | None
+        """
+
+        if discharge_date is None:
+            return
+
+        heapq.heappush(
+            self.heap,
+            (discharge_date, self.sequence, patient, department)
+        )
+        self.sequence += 1
+
+    def discharge_due(self, current_date: date) -> int:
+
+        """
+        Discharges every stay with discharge date <= current date
+        
+        :param self: References class
+        :param current_date: Current date
+        :type current_date: date
+        :return: Number of stays discharged
+        :rtype: int
+        """
+
+        discharged = 0
+
+        while self.heap and self.heap[0][0] <= current_date:
+            _, _, _, department = heapq.heappop(self.heap)
+            department.discharge()
+            discharged += 1
+
+        return discharged
+
+    def __len__(self) -> int:
+
+        """
+        Number of scheduled stays
+        
+        :param self: References class
+        """
+
+        return len(self.heap)
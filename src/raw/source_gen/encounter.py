@@ -16,7 +16,8 @@ def generate_encounter_event(
         encounter_type: str, 
         department: str, 
         waiting_list: bool=False, 
-        wait_time: int=0
+        wait_time: int=0,
+        sink=None
         ):
 
     """
@@ -36,6 +37,7 @@ def generate_encounter_event(
     :type waiting_list: bool
     :param wait_time: Waiting time length in days, default 0
     :type wait_time: int
+    :param sink: Output sink, defaults to configured sink
     """
 
     event = {
@@ -53,4 +55,4 @@ def generate_encounter_event(
         "source_system": "ehr",
     }
 
-    write_to_bucket(event)
+    write_to_bucket(event, sink)
@@ -2,15 +2,30 @@
 Entry point for source data generator
 Generates encounter events for admissions and discharges
 Captures operational data for downstream analytics
+Events written to sink configured by RAW_SINK
 """
+
+import argparse
+from datetime import date, timedelta
 from src.raw.source_gen.admission import generate_admissions
+from src.metrics import metrics
 
 # --------------------------------------------------
 # Entry Point
 # --------------------------------------------------
 
 def main():
-    generate_admissions()
+
+    parser = argparse.ArgumentParser(description="Generate raw events to the RAW_SINK backend")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 1, 28))
+    parser.add_argument("--days", type=int, default=None, help="Simulated horizon, defaults to two years")
+    args = parser.parse_args()
+
+    end = args.start + timedelta(days=args.days - 1) if args.days else date(2027, 1, 28)
+
+    metrics.export_at_exit("generator")
+    generate_admissions(seed=args.seed, start=args.start, end=end)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
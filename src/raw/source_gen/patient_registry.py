@@ -1,7 +1,9 @@
 """
 Patient registry Class
+Maintains indexed pool of admittable patients
 """
 
+import heapq
 import random
 from datetime import date
 from src.raw.source_gen.patients import Patient
@@ -12,20 +14,32 @@ from src.raw.source_gen.patients import Patient
 
 class PatientRegistry:
 
-    def __init__(self, patient_ids: range):
+    def __init__(self, patient_ids: range, rng: random.Random | None = None):
 
         """
         Initialise class
+        Admittable pool is a swap-remove array with position index
+        Admitted patients are held in release schedule keyed by discharge date
         
         :param self: References class
         :param patient_ids: int Range of patient identifiers
         :type patient_ids: range
+        :param rng: Random generator, defaults to global random
+        :type rng: random.Random | None
         """
 
+        self.rng = rng or random
         self.patients = {
-            pid: Patient(pid) for pid in patient_ids
+            pid: Patient(pid, self.rng) for pid in patient_ids
         }
 
+        self.admittable = list(self.patients)
+        self.positions = {
+            pid: i for i, pid in enumerate(self.admittable)
+        }
+        self.releases = {}
+        self.release_dates = []
+
     def get(self, patient_id: int) -> Patient:
 
         """
@@ -43,7 +57,8 @@ class PatientRegistry:
     def get_random_admittable(self, admit_date: date) -> Patient | None:
 
         """
-        Return random patient from patients dict
+        Return random patient from admittable pool
+        Releases patients discharged before admit date first
         
         :param self: References class
         :param admit_date: Date of admission
@@ -52,12 +67,90 @@ class PatientRegistry:
         :rtype: Patient | None
         """
 
-        eligible = [
-            p for p in self.patients.values()
-            if p.can_admit(admit_date)
-        ]
+        self.release_until(admit_date)
 
-        if not eligible:
+        if not self.admittable:
             return None
 
-        return random.choice(eligible)
+        return self.patients[self.rng.choice(self.admittable)]
+
+    def record_admission(self, patient: Patient):
+
+        """
+        Removes admitted patient from admittable pool
+        Schedules release for day after discharge date
+        Patient admission_date/discharge_date must already be set
+        
+        :param self: References class
+        :param patient: Admitted patient
+        :type patient: Patient
+        """
+
+        self.remove_admittable(patient.patient_id)
+
+        discharge_date = patient.discharge_date
+
+        if discharge_date is None:
+            return
+
+        if discharge_date not in self.releases:
+            self.releases[discharge_date] = []
+            heapq.heappush(self.release_dates, discharge_date)
+
+        self.releases[discharge_date].append(patient.patient_id)
+
+    def release_until(self, admit_date: date):
+
+        """
+        Returns patients with discharge date before admit date to pool
+        
+        :param self: References class
+        :param admit_date: Date of admission
+        :type admit_date: date
+        """
+
+        while self.release_dates and self.release_dates[0] < admit_date:
+            discharge_date = heapq.heappop(self.release_dates)
+
+            for pid in self.releases.pop(discharge_date):
+                patient = self.patients[pid]
+
+                if patient.discharge_date == discharge_date:
+                    self.add_admittable(pid)
+
+    def add_admittable(self, patient_id: int):
+
+        """
+        Appends patient to admittable pool
+        
+        :param self: References class
+        :param patient_id: Patient identifier
+        :type patient_id: int
+        """
+
+        if patient_id in self.positions:
+            return
+
+        self.positions[patient_id] = len(self.admittable)
+        self.admittable.append(patient_id)
+
+    def remove_admittable(self, patient_id: int):
+
+        """
+        Swap-removes patient from admittable pool
+        
+        :param self: References class
+        :param patient_id: Patient identifier
+        :type patient_id: int
+        """
+
+        i = self.positions.pop(patient_id, None)
+
+        if i is None:
+            return
+
+        last = self.admittable.pop()
+
+        if last != patient_id:
+            self.admittable[i] = last
+            self.positions[last] = i
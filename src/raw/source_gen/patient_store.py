@@ -0,0 +1,408 @@
+"""
+Compact patient store and registry
+Parallel NumPy arrays instead of one Patient object per patient
+Same get/can_admit semantics as Patient and PatientRegistry
+"""
+
+import heapq
+import random
+import numpy as np
+from datetime import date
+
+GENDERS = ("male", "female")
+NO_DATE = 0
+
+# --------------------------------------------------
+# Patient Store Class
+# --------------------------------------------------
+
+class PatientStore:
+
+    def __init__(self, patient_ids: range, rng: np.random.Generator | None = None):
+
+        """
+        Initialise columnar store, vectorised
+        Dates held as ordinals, 0 = None
+        Patient ids must be a contiguous range
+        
+        :param self: References class
+        :param patient_ids: int Range of patient identifiers
+        :type patient_ids: range
+        :param rng: NumPy generator, defaults to unseeded
+        :type rng: np.random.Generator | None
+        """
+
+        if patient_ids.step != 1:
+            raise ValueError("Patient ids must be a contiguous range")
+
+        rng = rng if rng is not None else np.random.default_rng()
+        n = len(patient_ids)
+
+        self.first_id = patient_ids.start
+        self.ids = np.arange(patient_ids.start, patient_ids.stop, dtype=np.int64)
+        self.gender_code = rng.integers(0, len(GENDERS), size=n, dtype=np.int8)
+        self.admission_ordinal = np.zeros(n, dtype=np.int32)
+        self.discharge_ordinal = np.zeros(n, dtype=np.int32)
+        self.waiting_flag = np.zeros(n, dtype=np.bool_)
+        self.waiting_days = np.zeros(n, dtype=np.int16)
+
+    def __len__(self) -> int:
+
+        """
+        Number of patients
+        
+        :param self: References class
+        """
+
+        return len(self.ids)
+
+    def index_of(self, patient_id: int) -> int:
+
+        """
+        Returns array index for patient id
+        
+        :param self: References class
+        :param patient_id: Patient identifier
+        :type patient_id: int
+        :return: Array index
+        :rtype: int
+        """
+
+        i = patient_id - self.first_id
+
+        if i < 0 or i >= len(self.ids):
+            raise KeyError(patient_id)
+
+        return i
+
+    def get(self, patient_id: int) -> "PatientView":
+
+        """
+        Returns view of patient
+        
+        :param self: References class
+        :param patient_id: Patient identifier
+        :type patient_id: int
+        :return: Patient view
+        :rtype: PatientView
+        """
+
+        return PatientView(self, self.index_of(patient_id))
+
+    def can_admit(self, i: int, admit_date: date) -> bool:
+
+        """
+        Determines if patient at index can be admitted
+        Same rules as Patient.can_admit
+        
+        :param self: References class
+        :param i: Array index
+        :type i: int
+        :param admit_date: Date of admission
+        :type admit_date: date
+        :return: True/False
+        :rtype: bool
+        """
+
+        admission = self.admission_ordinal[i]
+        discharge = self.discharge_ordinal[i]
+
+        if admission == NO_DATE and discharge == NO_DATE:
+            return True
+
+        if admission != NO_DATE and discharge == NO_DATE:
+            return False
+
+        admit = admit_date.toordinal()
+
+        if admission == admit:
+            return False
+
+        return admit > discharge
+
+    def nbytes(self) -> int:
+
+        """
+        Bytes held by store arrays
+        
+        :param self: References class
+        """
+
+        return sum(
+            a.nbytes for a in (
+                self.ids,
+                self.gender_code,
+                self.admission_ordinal,
+                self.discharge_ordinal,
+                self.waiting_flag,
+                self.waiting_days,
+            )
+        )
+
+# --------------------------------------------------
+# Patient View Class
+# --------------------------------------------------
+
+def ordinal_to_date(ordinal: int) -> date | None:
+
+    """
+    Converts stored ordinal to date
+    
+    :param ordinal: Date ordinal, 0 = None
+    :type ordinal: int
+    :return: Date or None
+    :rtype: date | None
+    """
+
+    return None if ordinal == NO_DATE else date.fromordinal(int(ordinal))
+
+class PatientView:
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: PatientStore, index: int):
+
+        """
+        Lightweight view over one row of PatientStore
+        Exposes Patient attributes
+        
+        :param self: References class
+        :param store: Patient store
+        :type store: PatientStore
+        :param index: Array index
+        :type index: int
+        """
+
+        self.store = store
+        self.index = index
+
+    @property
+    def patient_id(self) -> int:
+        return int(self.store.ids[self.index])
+
+    @property
+    def gender(self) -> str:
+        return GENDERS[self.store.gender_code[self.index]]
+
+    @property
+    def admission_date(self) -> date | None:
+        return ordinal_to_date(self.store.admission_ordinal[self.index])
+
+    @admission_date.setter
+    def admission_date(self, value: date | None):
+        self.store.admission_ordinal[self.index] = NO_DATE if value is None else value.toordinal()
+
+    @property
+    def discharge_date(self) -> date | None:
+        return ordinal_to_date(self.store.discharge_ordinal[self.index])
+
+    @discharge_date.setter
+    def discharge_date(self, value: date | None):
+        self.store.discharge_ordinal[self.index] = NO_DATE if value is None else value.toordinal()
+
+    @property
+    def waiting_list(self) -> bool:
+        return bool(self.store.waiting_flag[self.index])
+
+    @waiting_list.setter
+    def waiting_list(self, value: bool):
+        self.store.waiting_flag[self.index] = value
+
+    @property
+    def waiting_time(self) -> int:
+        return int(self.store.waiting_days[self.index])
+
+    @waiting_time.setter
+    def waiting_time(self, value: int):
+        self.store.waiting_days[self.index] = value
+
+    def patient_on_waiting_list(self) -> bool:
+
+        """
+        Is patient present on waiting list
+        
+        :param self: References class
+        :return: True if on waiting list
+        :rtype: bool
+        """
+
+        return self.waiting_list
+
+    def can_admit(self, admit_date: date) -> bool:
+
+        """
+        Determines if patient can be admitted
+        
+        :param self: References class
+        :param admit_date: Date of admission
+        :type admit_date: date
+        :return: True/False
+        :rtype: bool
+        """
+
+        return self.store.can_admit(self.index, admit_date)
+
+# --------------------------------------------------
+# Compact Patient Registry Class
+# --------------------------------------------------
+
+class CompactPatientRegistry:
+
+    def __init__(
+            self,
+            patient_ids: range,
+            rng: random.Random | None = None,
+            np_rng: np.random.Generator | None = None
+            ):
+
+        """
+        Initialise registry over PatientStore
+        Admittable pool is a swap-remove int32 array with position array
+        Admitted patients are held in release schedule keyed by discharge date
+        
+        :param self: References class
+        :param patient_ids: int Range of patient identifiers
+        :type patient_ids: range
+        :param rng: Random generator for sampling, defaults to global random
+        :type rng: random.Random | None
+        :param np_rng: NumPy generator for store construction
+        :type np_rng: np.random.Generator | None
+        """
+
+        self.rng = rng or random
+        self.store = PatientStore(patient_ids, np_rng)
+
+        n = len(self.store)
+        self.admittable = np.arange(n, dtype=np.int32)
+        self.positions = np.arange(n, dtype=np.int32)
+        self.admittable_count = n
+        self.releases = {}
+        self.release_dates = []
+
+    def get(self, patient_id: int) -> PatientView:
+
+        """
+        Returns patient view
+        
+        :param self: References class
+        :param patient_id: Patient identifier
+        :type patient_id: int
+        :return: Patient view
+        :rtype: PatientView
+        """
+
+        return self.store.get(patient_id)
+
+    def get_random_admittable(self, admit_date: date) -> PatientView | None:
+
+        """
+        Return random patient from admittable pool
+        Releases patients discharged before admit date first
+        
+        :param self: References class
+        :param admit_date: Date of admission
+        :type admit_date: date
+        :return: Patient view or None
+        :rtype: PatientView | None
+        """
+
+        self.release_until(admit_date)
+
+        if self.admittable_count == 0:
+            return None
+
+        i = self.admittable[self.rng.randrange(self.admittable_count)]
+
+        return PatientView(self.store, int(i))
+
+    def record_admission(self, patient: PatientView):
+
+        """
+        Removes admitted patient from admittable pool
+        Schedules release for day after discharge date
+        
+        :param self: References class
+        :param patient: Admitted patient
+        :type patient: PatientView
+        """
+
+        i = patient.index
+        self.remove_admittable(i)
+
+        discharge = int(self.store.discharge_ordinal[i])
+
+        if discharge == NO_DATE:
+            return
+
+        if discharge not in self.releases:
+            self.releases[discharge] = []
+            heapq.heappush(self.release_dates, discharge)
+
+        self.releases[discharge].append(i)
+
+    def release_until(self, admit_date: date):
+
+        """
+        Returns patients with discharge date before admit date to pool
+        
+        :param self: References class
+        :param admit_date: Date of admission
+        :type admit_date: date
+        """
+
+        admit = admit_date.toordinal()
+
+        while self.release_dates and self.release_dates[0] < admit:
+            discharge = heapq.heappop(self.release_dates)
+
+            for i in self.releases.pop(discharge):
+                if self.store.discharge_ordinal[i] == discharge:
+                    self.add_admittable(i)
+
+    def add_admittable(self, i: int):
+
+        """
+        Appends patient index to admittable pool
+        
+        :param self: References class
+        :param i: Array index
+        :type i: int
+        """
+
+        if self.positions[i] >= 0:
+            return
+
+        self.positions[i] = self.admittable_count
+        self.admittable[self.admittable_count] = i
+        self.admittable_count += 1
+
+    def remove_admittable(self, i: int):
+
+        """
+        Swap-removes patient index from admittable pool
+        
+        :param self: References class
+        :param i: Array index
+        :type i: int
+        """
+
+        position = self.positions[i]
+
+        if position < 0:
+            return
+
+        self.admittable_count -= 1
+        last = self.admittable[self.admittable_count]
+        self.admittable[position] = last
+        self.positions[last] = position
+        self.positions[i] = -1
+
+    def nbytes(self) -> int:
+
+        """
+        Bytes held by store and pool arrays
+        
+        :param self: References class
+        """
+
+        return self.store.nbytes() + self.admittable.nbytes + self.positions.nbytes
@@ -11,7 +11,7 @@ from datetime import date
 
 class Patient:
     
-    def __init__(self, patient_id: int):
+    def __init__(self, patient_id: int, rng: random.Random | None = None):
 
         """
         Initialise patient class
@@ -19,10 +19,12 @@ class Patient:
         :param self: References class
         :param patient_id: Patient identifier
         :type patient_id: int
+        :param rng: Random generator, defaults to global random
+        :type rng: random.Random | None
         """
 
         self.patient_id = patient_id
-        self.gender = random.choice(["male", "female"])
+        self.gender = (rng or random).choice(["male", "female"])
         self.admission_date: date | None = None
         self.discharge_date: date | None = None
         self.waiting_list: bool = False
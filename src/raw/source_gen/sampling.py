@@ -0,0 +1,187 @@
+"""
+Sampler Class
+Pre-samples random quantities for the whole simulation horizon
+Arrival counts drawn in one call, timestamps and lengths of stay
+drawn in blocks and consumed by cursor
+"""
+
+import numpy as np
+from datetime import date, datetime, timedelta, timezone
+from src.raw.source_gen.constants import PRESSURE_MULTIPLIER, DAILY_ADMISSION_BASELINE
+
+SECONDS_PER_DAY = 86400
+SAMPLE_BLOCK_SIZE = 8192
+
+# --------------------------------------------------
+# Sampler Class
+# --------------------------------------------------
+
+class Sampler:
+
+    def __init__(
+            self,
+            start: date,
+            end: date,
+            baseline: int = DAILY_ADMISSION_BASELINE,
+            rng: np.random.Generator | None = None,
+            block_size: int = SAMPLE_BLOCK_SIZE
+            ):
+
+        """
+        Initialises sampler
+        Draws Poisson arrival counts for every day start..end
+        using monthly pressure multiplier
+        
+        :param self: References class
+        :param start: First simulated date
+        :type start: date
+        :param end: Last simulated date
+        :type end: date
+        :param baseline: Baseline admissions constant
+        :type baseline: int
+        :param rng: NumPy generator, defaults to unseeded
+        :type rng: np.random.Generator | None
+        :param block_size: Number of values drawn per block
+        :type block_size: int
+        """
+
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.start = start
+        self.block_size = block_size
+        self.blocks = {}
+        self.cursors = {}
+
+        days = (end - start).days + 1
+        multipliers = np.array([
+            PRESSURE_MULTIPLIER[(start + timedelta(days=i)).month]
+            for i in range(days)
+        ])
+
+        self.arrival_counts = self.rng.poisson(baseline * multipliers).tolist()
+
+    def arrivals(self, day: date) -> int:
+
+        """
+        Returns pre-sampled admissions for day
+        
+        :param self: References class
+        :param day: Simulated date
+        :type day: date
+        :return: Poisson adjusted admissions
+        :rtype: int
+        """
+
+        return self.arrival_counts[(day - self.start).days]
+
+    def next_value(self, key, draw):
+
+        """
+        Returns next value from block for key
+        Draws new block when exhausted
+        
+        :param self: References class
+        :param key: Block identifier
+        :param draw: Callable returning list of block_size values
+        """
+
+        values = self.blocks.get(key)
+        i = self.cursors.get(key, 0)
+
+        if values is None or i >= len(values):
+            values = draw(self.block_size)
+            self.blocks[key] = values
+            i = 0
+
+        self.cursors[key] = i + 1
+
+        return values[i]
+
+    def timestamp(self, day: date) -> datetime:
+
+        """
+        Returns UTC timestamp uniformly distributed over day
+        
+        :param self: References class
+        :param day: Date
+        :type day: date
+        :return: Timestamp
+        :rtype: datetime
+        """
+
+        return self.timestamp_between(day, 0, 24)
+
+    def timestamp_between(self, day: date, start_hour: int, end_hour: int) -> datetime:
+
+        """
+        Returns UTC timestamp on day between hours, second resolution
+        
+        :param self: References class
+        :param day: Date
+        :type day: date
+        :param start_hour: Start time
+        :type start_hour: int
+        :param end_hour: End time
+        :type end_hour: int
+        :return: Timestamp
+        :rtype: datetime
+        """
+
+        low = start_hour * 3600
+        high = end_hour * 3600
+
+        seconds = self.next_value(
+            ("seconds", low, high),
+            lambda n: self.rng.integers(low, high, size=n).tolist()
+        )
+
+        return datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(seconds=seconds)
+
+    def length_of_stay(self, stay_min: int, stay_max: int) -> int:
+
+        """
+        Returns length of stay in days
+        90% stay_min..stay_max, 8% long-stay 15..30, 2% bed block 31..90
+        Used by Department.generate_length_of_stay
+        
+        :param self: References class
+        :param stay_min: Minimum length of stay in days
+        :type stay_min: int
+        :param stay_max: Maximum length of stay in days
+        :type stay_max: int
+        :return: Length of stay in days
+        :rtype: int
+        """
+
+        return self.next_value(
+            ("stay", stay_min, stay_max),
+            lambda n: self.draw_length_of_stay(stay_min, stay_max, n)
+        )
+
+    def draw_length_of_stay(self, stay_min: int, stay_max: int, n: int) -> list[int]:
+
+        """
+        Draws block of lengths of stay from mixture
+        
+        :param self: References class
+        :param stay_min: Minimum length of stay in days
+        :type stay_min: int
+        :param stay_max: Maximum length of stay in days
+        :type stay_max: int
+        :param n: Number of values
+        :type n: int
+        :return: Lengths of stay in days
+        :rtype: list[int]
+        """
+
+        r = self.rng.random(n)
+
+        days = np.select(
+            [r <= 0.9, r < 0.98],
+            [
+                self.rng.integers(stay_min, stay_max + 1, size=n),
+                self.rng.integers(15, 31, size=n),
+            ],
+            self.rng.integers(31, 91, size=n)
+        )
+
+        return days.tolist()
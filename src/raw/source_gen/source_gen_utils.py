@@ -2,43 +2,13 @@
 Helper functions
 """
 
-import random
 import statistics
-from datetime import datetime, timezone, time, date
+from datetime import datetime, date
 
 # --------------------------------------------------
 # Time
 # --------------------------------------------------
 
-def create_timestamp(date: date) -> datetime:
-
-    """
-    Create timestamp from date
-    
-    :param date: Date
-    :type date: date
-    :return: Timestamp
-    :rtype: datetime
-    """
-
-    encounter_date = date
-    t = generate_time()
-    ts = datetime.combine(encounter_date, t)
-
-    return ts.replace(tzinfo=timezone.utc)
-
-def generate_time():
-
-    """
-    Generate random time
-    """
-
-    return time(
-        hour=random.randint(0, 23),
-        minute=random.randint(0, 59),
-        second=random.randint(0, 59)
-    )
-
 def date_from_timestamp(ts: datetime) -> date:
 
     """
@@ -55,25 +25,6 @@ def date_from_timestamp(ts: datetime) -> date:
 
     return dt.date()
 
-def random_time_between(start_hour: int, end_hour: int) -> time:
-
-    """
-    Create random time between hours 24hr format
-    
-    :param start_hour: Start time
-    :type start_hour: int
-    :param end_hour: End time
-    :type end_hour: int
-    :return: Random time
-    :rtype: time
-    """
-
-    hour = random.randint(start_hour, end_hour - 1)
-    minute = random.randint(0, 59)
-    second = random.randint(0, 59)
-
-    return time(hour, minute, second)
-
 # --------------------------------------------------
 # Statistics
 # --------------------------------------------------
@@ -86,7 +37,11 @@ def validate_queue_dynamics(wait_times: list):
     :param wait_times: List of accumulated wait times across entire date range
     :type wait_times: list(int)
     """
-    
+
+    if len(wait_times) < 2: # short horizons, quantiles need two samples
+        print(f"[SKIP] Wait time statistics need at least 2 waits, got {len(wait_times)}")
+        return
+
     avg = sum(wait_times) / len(wait_times)
     median = statistics.median(wait_times)
     mode = statistics.mode(wait_times)
@@ -1,6 +1,7 @@
 """
 Waiting list queue Class
-FIFO
+FIFO with patient id index
+Removal from middle of queue via tombstones
 """
 
 from collections import deque
@@ -18,26 +19,37 @@ class WaitingList:
         """
         Docstring for __init__
         
-        Initialise queue
+        Initialise queue, patient id index and live entry count
         """
 
         self.queue = deque()
+        self.index = {}
+        self.count = 0
 
     def add(self, patient, request_date: date):
 
         """
         Add patient instance to queue
+        Ignored if patient already waiting
         
         :param self: References class
         :param patient: Patient class
         :param request_date: ISO Date of insertion
         :type request_date: date
         """
-        
-        self.queue.append({
+
+        if patient.patient_id in self.index:
+            return
+
+        entry = {
             "patient": patient,
-            "request_date": request_date
-        })
+            "request_date": request_date,
+            "removed": False
+        }
+
+        self.queue.append(entry)
+        self.index[patient.patient_id] = entry
+        self.count += 1
 
     def has_waiting(self) -> bool:
 
@@ -49,7 +61,7 @@ class WaitingList:
         :rtype: bool
         """
 
-        return len(self.queue) > 0
+        return self.count > 0
     
     def has_patient(self, patient) -> bool:
 
@@ -62,10 +74,40 @@ class WaitingList:
         :rtype: bool
         """
 
-        return any(
-            entry["patient"] == patient
-            for entry in self.queue
-        )
+        return patient.patient_id in self.index
+
+    def remove(self, patient) -> bool:
+
+        """
+        Removes patient from anywhere in queue
+        Entry is tombstoned and skipped when it reaches the front
+        
+        :param self: References class
+        :param patient: Patient class
+        :return: True if patient was waiting
+        :rtype: bool
+        """
+
+        entry = self.index.pop(patient.patient_id, None)
+
+        if entry is None:
+            return False
+
+        entry["removed"] = True
+        self.count -= 1
+
+        return True
+
+    def discard_removed(self):
+
+        """
+        Drops tombstoned entries from front of queue
+        
+        :param self: References class
+        """
+
+        while self.queue and self.queue[0]["removed"]:
+            self.queue.popleft()
 
     def peek(self):
 
@@ -75,6 +117,8 @@ class WaitingList:
         :param self: References class
         """
 
+        self.discard_removed()
+
         return self.queue[0]
 
     def pop_patient(self):
@@ -84,10 +128,16 @@ class WaitingList:
         
         :param self: References class
         """
-        
-        return self.queue.popleft()
+
+        self.discard_removed()
+
+        entry = self.queue.popleft()
+        del self.index[entry["patient"].patient_id]
+        self.count -= 1
+
+        return entry
     
-    def waiting_list_snapshot(self, ts: str, phase: str):
+    def waiting_list_snapshot(self, ts: str, phase: str, sink=None):
 
         """
         Generates snapshot of waiting list
@@ -97,14 +147,15 @@ class WaitingList:
         :type ts: Timestamp
         :param phase: Start Of Day/End Of Day
         :type phase: str
+        :param sink: Output sink, defaults to configured sink
         """
 
         snapshot = {
             "event_type": "wait_snapshot",
-            "waiting_count": len(self.queue),
+            "waiting_count": self.count,
             "phase": phase,
             "event_ts": ts,
             "source_system": "waiting_list",
         }
 
-        write_to_bucket(snapshot)
+        write_to_bucket(snapshot, sink)
@@ -0,0 +1,322 @@
+"""
+Raw-layer compaction
+Rolls each event_type/event_date day of small NDJSON objects
+into a few gzip NDJSON objects under compacted/
+Marker (_COMPACTED) written after verification commits the day,
+staging then reads compacted objects (see effective_objects)
+Originals kept, deleted or archived only after marker is written
+Originals count as compacted only if listed in the marker's sources
+Idempotent and resumable: reruns skip committed days,
+compact late-arriving objects as a new generation
+and finish removing originals of committed days
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pyarrow.fs import FileSystem, FileInfo
+from src.metrics import metrics
+from src.staging.manifest import Manifest
+from src.staging.staging_config import staging_bucket, raw_prefix, fetch_workers, compact_target_bytes
+from src.staging.staging_utils import (
+    COMPACTED_DIR, COMPACTED_MARKER,
+    get_filesystem, list_raw_days, committed_paths, open_manifest, raw_root,
+)
+
+RAW_EVENT_TYPES = ["admission", "discharge", "wait_snapshot", "dep_snapshot"]
+
+# --------------------------------------------------
+# Object I/O
+# --------------------------------------------------
+
+def read_object(fs: FileSystem, path: str) -> bytes:
+
+    """
+    Reads object, decompressing .gz by extension
+    Ensures trailing newline so objects concatenate as NDJSON
+
+    :param fs: Filesystem
+    :type fs: FileSystem
+    :param path: Object path
+    :type path: str
+    :return: NDJSON bytes
+    :rtype: bytes
+    """
+
+    with fs.open_input_stream(path) as f:
+        data = f.read()
+
+    if data and not data.endswith(b"\n"):
+        data += b"\n"
+
+    return data
+
+def remove_originals(fs: FileSystem, objects: list[FileInfo], originals: str, bucket: str):
+
+    """
+    Deletes or archives compacted originals, keep leaves them in place
+    Archive mirrors path under {raw_prefix}_archive (_archive when prefix empty)
+
+    :param fs: Filesystem
+    :type fs: FileSystem
+    :param objects: Original objects already committed by marker
+    :type objects: list[FileInfo]
+    :param originals: keep, delete or archive
+    :type originals: str
+    :param bucket: S3 Bucket
+    :type bucket: str
+    """
+
+    if originals == "keep":
+        return
+
+    for f in objects:
+
+        if originals == "delete":
+            fs.delete_file(f.path)
+            continue
+
+        archive_path = f"{raw_root(bucket, f'{raw_prefix}_archive')}/{f.path[len(raw_root(bucket)) + 1:]}"
+        fs.create_dir(archive_path.rsplit("/", 1)[0], recursive=True)
+        fs.move(f.path, archive_path)
+
+# --------------------------------------------------
+# Compact Day
+# --------------------------------------------------
+
+def compact_day(
+        fs: FileSystem,
+        bucket: str,
+        event_type: str,
+        day_dir: str,
+        day: dict,
+        originals: str = "keep",
+        target_bytes: int = compact_target_bytes,
+        manifest: Manifest | None = None
+        ) -> dict | None:
+
+    """
+    Compacts original objects of one day not yet committed by its marker
+    1. Reads sources in path order
+    2. Writes gzip NDJSON objects of ~target_bytes (uncompressed),
+       named compacted/{event_type}-{generation}-{i}.json.gz
+    3. Verifies compacted objects: line count and sha256 match sources
+    4. Writes marker, commit point for staging
+    5. Removes originals (keep/delete/archive)
+    Days partly staged by the incremental manifest are skipped,
+    fully staged days have compacted objects recorded as staged
+
+    :param fs: Filesystem
+    :type fs: FileSystem
+    :param bucket: S3 Bucket
+    :type bucket: str
+    :param event_type: Raw event type
+    :type event_type: str
+    :param day_dir: bucket/raw/event_type/event_date=YYYY-MM-DD
+    :type day_dir: str
+    :param day: Day entry from list_raw_days
+    :type day: dict
+    :param originals: keep, delete or archive
+    :type originals: str
+    :param target_bytes: Uncompressed bytes per compacted object
+    :type target_bytes: int
+    :param manifest: Incremental staging manifest
+    :type manifest: Manifest | None
+    :return: Report, None if nothing to compact
+    :rtype: dict | None
+    """
+
+    committed_sources = committed_paths(day, "sources")
+    committed = [f for f in day["originals"] if f.path in committed_sources]
+    remove_originals(fs, committed, originals, bucket) # resume interrupted removal
+    sources = [f for f in day["originals"] if f.path not in committed_sources]
+
+    if not sources:
+        return None
+
+    sources = sorted(sources, key=lambda f: f.path)
+    staged = manifest.lookup([f.path for f in sources]) if manifest else {}
+
+    if 0 < len(staged) < len(sources):
+        print(f"[SKIP] {day_dir} partly staged, stage remaining objects before compacting")
+        return None
+
+    started = time.perf_counter()
+    state = {"generations": list(day["state"]["generations"])}
+    generation = len(state["generations"])
+    prefix = f"{day_dir}/{COMPACTED_DIR}/{event_type}-{generation}-"
+
+    for f in day["compacted"]:
+        if f.path.startswith(prefix): # uncommitted objects from interrupted run
+            fs.delete_file(f.path)
+
+    with ThreadPoolExecutor(max_workers=max(1, fetch_workers)) as pool:
+        bodies = list(pool.map(lambda f: read_object(fs, f.path), sources))
+
+    source_digest = hashlib.sha256()
+    source_rows = 0
+    chunks = [[]]
+    chunk_bytes = 0
+
+    for body in bodies:
+        source_digest.update(body)
+        source_rows += body.count(b"\n")
+
+        if chunk_bytes and chunk_bytes + len(body) > target_bytes:
+            chunks.append([])
+            chunk_bytes = 0
+
+        chunks[-1].append(body)
+        chunk_bytes += len(body)
+
+    fs.create_dir(f"{day_dir}/{COMPACTED_DIR}", recursive=True)
+    objects = []
+
+    for i, chunk in enumerate(chunks):
+        path = f"{prefix}{i}.json.gz"
+
+        with fs.open_output_stream(path, compression="gzip") as f:
+            for body in chunk:
+                f.write(body)
+
+        objects.append(path)
+
+    compacted_digest = hashlib.sha256()
+    compacted_rows = 0
+
+    for path in objects:
+        body = read_object(fs, path)
+        compacted_digest.update(body)
+        compacted_rows += body.count(b"\n")
+
+    if compacted_digest.hexdigest() != source_digest.hexdigest() or compacted_rows != source_rows:
+        raise RuntimeError(
+            f"Compaction verification failed for {day_dir}: "
+            f"{source_rows} source rows, {compacted_rows} compacted rows"
+        )
+
+    state["generations"].append({
+        "objects": objects,
+        "sources": [f.path for f in sources],
+        "rows": source_rows,
+        "sha256": source_digest.hexdigest(),
+        "compacted_at": datetime.now(timezone.utc).isoformat(),
+    })
+
+    with fs.open_output_stream(f"{day_dir}/{COMPACTED_MARKER}") as f:
+        f.write(json.dumps(state, indent=2).encode("utf-8"))
+
+    if staged:
+        partition, output = next(iter(staged.values()))
+        manifest.record(event_type, partition, fs.get_file_info(objects), output)
+
+    remove_originals(fs, sources, originals, bucket)
+
+    return {
+        "day": day_dir,
+        "generation": generation,
+        "sources": len(sources),
+        "objects": len(objects),
+        "rows": source_rows,
+        "source_bytes": sum(f.size or 0 for f in sources),
+        "compacted_bytes": sum(f.size for f in fs.get_file_info(objects)),
+        "seconds": time.perf_counter() - started,
+    }
+
+# --------------------------------------------------
+# Compact Raw
+# --------------------------------------------------
+
+def compact_raw(
+        bucket: str = staging_bucket,
+        event_types: list[str] | None = None,
+        until: str | None = None,
+        originals: str = "keep",
+        target_bytes: int = compact_target_bytes,
+        fs: FileSystem | None = None,
+        manifest: Manifest | None = None
+        ) -> list[dict]:
+
+    """
+    Compacts every raw day up to and including until
+
+    :param bucket: S3 Bucket
+    :type bucket: str
+    :param event_types: Raw event types, defaults to all
+    :type event_types: list[str] | None
+    :param until: Last day to compact YYYY-MM-DD, None for all days
+    :type until: str | None
+    :param originals: keep, delete or archive
+    :type originals: str
+    :param target_bytes: Uncompressed bytes per compacted object
+    :type target_bytes: int
+    :param fs: Filesystem, defaults to shared S3 filesystem
+    :type fs: FileSystem | None
+    :param manifest: Incremental staging manifest
+    :type manifest: Manifest | None
+    :return: Per-day reports
+    :rtype: list[dict]
+    """
+
+    fs = fs or get_filesystem()
+    reports = []
+
+    for event_type in event_types or RAW_EVENT_TYPES:
+
+        days = list_raw_days(fs, f"{raw_root(bucket)}/{event_type}")
+
+        for day_dir, day in sorted(days.items()):
+
+            if until is not None and day_dir.rsplit("event_date=", 1)[1] > until:
+                continue
+
+            report = compact_day(fs, bucket, event_type, day_dir, day, originals, target_bytes, manifest)
+
+            if report is None:
+                continue
+
+            reports.append(report)
+            metrics.inc("compacted_days_total", event_type=event_type)
+            metrics.inc("compacted_objects_total", report["sources"], event_type=event_type)
+            print(
+                f"[OK] Compacted {report['day']} gen={report['generation']} "
+                f"{report['sources']} -> {report['objects']} objects, rows={report['rows']} "
+                f"bytes={report['source_bytes']} -> {report['compacted_bytes']}"
+            )
+
+    return reports
+
+# --------------------------------------------------
+# Entry Point
+# --------------------------------------------------
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Compact raw NDJSON objects per event type and day")
+    parser.add_argument("--bucket", default=staging_bucket)
+    parser.add_argument("--event-types", nargs="*", choices=RAW_EVENT_TYPES, default=None)
+    parser.add_argument("--until", default=None, help="Last day to compact, YYYY-MM-DD")
+    parser.add_argument("--originals", choices=["keep", "delete", "archive"], default="keep")
+    parser.add_argument("--target-bytes", type=int, default=compact_target_bytes)
+    args = parser.parse_args()
+
+    metrics.export_at_exit("compact_raw")
+
+    with open_manifest() as manifest, metrics.timer("stage_seconds", stage="compact_raw"):
+        reports = compact_raw(
+            args.bucket,
+            args.event_types,
+            args.until,
+            args.originals,
+            args.target_bytes,
+            manifest=manifest
+        )
+
+    print(f"[OK] Compacted {len(reports)} days, {sum(r['rows'] for r in reports)} rows")
+
+
+if __name__ == "__main__":
+    main()
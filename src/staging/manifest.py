@@ -0,0 +1,274 @@
+"""
+Processed-object manifest for incremental staging
+SQLite file, local path or remote URI (e.g. s3://bucket/key)
+Remote manifests are downloaded on open and uploaded on close
+Single writer: a remote manifest is locked by a lock object
+next to it (<path>.lock) from open to close, and close refuses
+to upload over a manifest changed since it was downloaded
+Local manifests rely on SQLite's own locking
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pyarrow.fs import FileSystem, FileInfo, FileType
+from src.staging.staging_config import manifest_lock_ttl
+
+# --------------------------------------------------
+# Manifest Class
+# --------------------------------------------------
+
+class Manifest:
+
+    def __init__(self, path: str):
+
+        """
+        Opens manifest, creating it if missing
+        
+        :param self: References class
+        :param path: Local path or filesystem URI
+        :type path: str
+        """
+
+        self.remote_fs = None
+        self.remote_path = None
+        self.local_path = path
+        self.token = uuid.uuid4().hex
+        self.generation = None
+
+        if "://" in path:
+            self.remote_fs, self.remote_path = FileSystem.from_uri(path)
+            self.lock_path = f"{self.remote_path}.lock"
+            self.local_path = os.path.join(tempfile.mkdtemp(), "manifest.sqlite")
+
+            self.acquire_lock()
+
+            try:
+                self.generation = self.remote_generation()
+
+                if self.generation is not None:
+                    with self.remote_fs.open_input_stream(self.remote_path) as src, open(self.local_path, "wb") as dst:
+                        dst.write(src.read())
+            except BaseException:
+                self.release_lock()
+                raise
+
+        self.conn = sqlite3.connect(self.local_path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS processed_objects (
+                path TEXT PRIMARY KEY,
+                event_type TEXT NOT NULL,
+                partition TEXT NOT NULL,
+                size INTEGER,
+                mtime TEXT,
+                output TEXT NOT NULL,
+                staged_at TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    def remote_generation(self) -> tuple | None:
+
+        """
+        Returns (mtime, size) of remote manifest, None when missing
+        
+        :param self: References class
+        :return: Remote generation
+        :rtype: tuple | None
+        """
+
+        info = self.remote_fs.get_file_info(self.remote_path)
+
+        if info.type != FileType.File:
+            return None
+
+        return (info.mtime, info.size)
+
+    def read_lock(self) -> dict | None:
+
+        """
+        Returns remote lock contents, None when unlocked
+        
+        :param self: References class
+        :return: Lock {token, owner, acquired}
+        :rtype: dict | None
+        """
+
+        if self.remote_fs.get_file_info(self.lock_path).type != FileType.File:
+            return None
+
+        with self.remote_fs.open_input_stream(self.lock_path) as f:
+            return json.loads(f.read())
+
+    def acquire_lock(self):
+
+        """
+        Takes remote lock for this writer
+        Raises when held by another writer for less than
+        STAGING_MANIFEST_LOCK_TTL, an older lock is taken over
+        Lock read back after writing, so of two writers
+        racing for it the overwritten one fails
+        
+        :param self: References class
+        """
+
+        lock = self.read_lock()
+
+        if lock is not None and time.time() - lock["acquired"] < manifest_lock_ttl:
+            acquired = datetime.fromtimestamp(lock["acquired"], timezone.utc).isoformat()
+            raise RuntimeError(
+                f"Manifest {self.remote_path} locked by {lock['owner']} since {acquired}, "
+                f"remove {self.lock_path} if no staging run is active"
+            )
+
+        with self.remote_fs.open_output_stream(self.lock_path) as f:
+            f.write(json.dumps({
+                "token": self.token,
+                "owner": f"{socket.gethostname()}:{os.getpid()}",
+                "acquired": time.time(),
+            }).encode("utf-8"))
+
+        lock = self.read_lock()
+
+        if lock is None or lock["token"] != self.token:
+            raise RuntimeError(f"Manifest {self.remote_path} lock taken by another writer")
+
+    def release_lock(self):
+
+        """
+        Removes remote lock if still held by this writer
+        
+        :param self: References class
+        """
+
+        lock = self.read_lock()
+
+        if lock is not None and lock["token"] == self.token:
+            self.remote_fs.delete_file(self.lock_path)
+
+    def processed_paths(self, event_type: str) -> set[str]:
+
+        """
+        Returns raw object paths already staged for event type
+        
+        :param self: References class
+        :param event_type: Raw event type
+        :type event_type: str
+        :return: Object paths
+        :rtype: set[str]
+        """
+
+        rows = self.conn.execute(
+            "SELECT path FROM processed_objects WHERE event_type = ?",
+            (event_type,)
+        )
+
+        return {path for (path,) in rows}
+
+    def lookup(self, paths: list[str]) -> dict[str, tuple[str, str]]:
+
+        """
+        Returns partition and output of staged paths,
+        unstaged paths omitted
+        
+        :param self: References class
+        :param paths: Raw object paths
+        :type paths: list[str]
+        :return: {path: (partition, output)}
+        :rtype: dict[str, tuple[str, str]]
+        """
+
+        found = {}
+
+        for i in range(0, len(paths), 500):
+            chunk = paths[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT path, partition, output FROM processed_objects WHERE path IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            found.update({path: (partition, output) for path, partition, output in rows})
+
+        return found
+
+    def record(self, event_type: str, partition: str, objects: list[FileInfo], output: str):
+
+        """
+        Records staged objects, committed per partition
+        so an interrupted run resumes from the last written partition
+        
+        :param self: References class
+        :param event_type: Raw event type
+        :type event_type: str
+        :param partition: Partition date - YYYY-MM || YYYY
+        :type partition: str
+        :param objects: Staged raw objects
+        :type objects: list[FileInfo]
+        :param output: Parquet file written
+        :type output: str
+        """
+
+        staged_at = datetime.now(timezone.utc).isoformat()
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO processed_objects VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    f.path,
+                    event_type,
+                    partition,
+                    f.size,
+                    f.mtime.isoformat() if f.mtime else None,
+                    output,
+                    staged_at,
+                )
+                for f in objects
+            ]
+        )
+        self.conn.commit()
+
+    def close(self):
+
+        """
+        Closes manifest, uploads remote copy and releases lock
+        Raises without uploading when the lock was taken over
+        or the remote manifest changed since download,
+        local copy kept for recovery
+        
+        :param self: References class
+        """
+
+        self.conn.close()
+
+        if self.remote_fs is None:
+            return
+
+        try:
+            lock = self.read_lock()
+
+            if lock is None or lock["token"] != self.token:
+                raise RuntimeError(
+                    f"Manifest {self.remote_path} lock lost, not uploaded, local copy {self.local_path}"
+                )
+
+            if self.remote_generation() != self.generation:
+                raise RuntimeError(
+                    f"Manifest {self.remote_path} changed by another writer, not uploaded, local copy {self.local_path}"
+                )
+
+            with open(self.local_path, "rb") as src, self.remote_fs.open_output_stream(self.remote_path) as dst:
+                dst.write(src.read())
+        finally:
+            self.release_lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
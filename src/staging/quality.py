@@ -0,0 +1,437 @@
+"""
+Vectorised data-quality gate for staging
+Checks are Arrow compute expressions over each staged batch,
+evaluated before timestamps are parsed and the cast to the staging schema,
+so null keys and unparseable timestamps are quarantined, not fatal
+Failing rows quarantined to a side table,
+per-partition quality report written alongside
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pap
+from pyarrow.fs import FileSystem, FileType
+from src.staging.staging_config import admission_lookback_days
+
+STAGED_TS = pa.timestamp("ms", tz="UTC")
+
+# --------------------------------------------------
+# Timestamps
+# --------------------------------------------------
+
+def _cast_or_null(value: pa.Scalar) -> int | None:
+
+    try:
+        return value.cast(pa.timestamp("us", tz="UTC")).value
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+
+def parse_timestamps(values: pa.ChunkedArray | pa.Array) -> pa.ChunkedArray | pa.Array:
+
+    """
+    Parses ISO-8601 strings as normalise_timestamps does,
+    unparseable values become null instead of failing the batch
+    Values parsed one by one only when the bulk cast fails
+
+    :param values: String timestamps
+    :type values: pa.ChunkedArray | pa.Array
+    :return: timestamp("ms", tz="UTC") values
+    :rtype: pa.ChunkedArray | pa.Array
+    """
+
+    if pa.types.is_timestamp(values.type):
+        return pc.cast(values, STAGED_TS, safe=False)
+
+    try:
+        parsed = pc.cast(values, pa.timestamp("us", tz="UTC"))
+    except pa.ArrowInvalid:
+        parsed = pa.array([_cast_or_null(v) for v in values], pa.timestamp("us", tz="UTC"))
+
+    return pc.cast(parsed, STAGED_TS, safe=False)
+
+# --------------------------------------------------
+# Checks
+# A check takes the pre-cast staged table and returns
+# a boolean array, True where the row passes,
+# or None when it cannot be evaluated (skipped)
+# --------------------------------------------------
+
+def schema_checks(schema: pa.Schema) -> dict:
+
+    """
+    Checks derived from staging schema:
+    non-nullable fields are not null,
+    integer fields fit the target integer type,
+    timestamp fields parse (nulls left to not_null)
+
+    :param schema: Staging schema
+    :type schema: pa.Schema
+    :return: Checks by name
+    :rtype: dict
+    """
+
+    checks = {}
+
+    for field in schema:
+
+        if not field.nullable:
+            checks[f"not_null:{field.name}"] = lambda t, name=field.name: t.column(name).is_valid()
+
+        if pa.types.is_integer(field.type):
+            info = np.iinfo(field.type.to_pandas_dtype())
+            checks[f"range:{field.name}"] = lambda t, name=field.name, lo=int(info.min), hi=int(info.max): pc.fill_null(
+                pc.and_(
+                    pc.greater_equal(t.column(name), lo),
+                    pc.less_equal(t.column(name), hi)
+                ),
+                True
+            )
+
+        if pa.types.is_timestamp(field.type):
+            checks[f"timestamp:{field.name}"] = lambda t, name=field.name: pc.or_(
+                pc.is_null(t.column(name)),
+                pc.is_valid(parse_timestamps(t.column(name)))
+            )
+
+    return checks
+
+def bed_checks() -> dict:
+
+    """
+    Department snapshot bed consistency
+    Null beds reported by not_null checks, pass here
+
+    :return: Checks by name
+    :rtype: dict
+    """
+
+    return {
+        "beds_occupied_le_total": lambda t: pc.fill_null(
+            pc.less_equal(t.column("beds_occupied"), t.column("beds_total")),
+            True
+        ),
+        "beds_available_eq_free": lambda t: pc.fill_null(
+            pc.equal(
+                t.column("beds_available"),
+                pc.subtract(t.column("beds_total"), t.column("beds_occupied"))
+            ),
+            True
+        ),
+    }
+
+def _asof_latest(left: pa.Table, right: pa.Table, column: str, tolerance_ms: int) -> pa.ChunkedArray:
+
+    """
+    Per-patient latest right event_ts at or before each left event_ts
+    Left holds patient_id, event_ts and row, result in row order
+    """
+
+    right = pa.table({
+        "patient_id": right.column("patient_id"),
+        "event_ts": right.column("event_ts"),
+        column: right.column(column),
+    }).sort_by("event_ts")
+
+    return (
+        left
+        .sort_by("event_ts")
+        .join_asof(right, on="event_ts", by="patient_id", tolerance=-tolerance_ms)
+        .sort_by("row")
+        .column(column)
+    )
+
+def discharge_after_admission(staged, lookback_days: int = admission_lookback_days) -> dict:
+
+    """
+    Discharge matched to the patient's latest staged admission
+    at or before it (per-patient as-of join), passes when
+    admission is before discharge and after the patient's previous
+    discharge, so a readmitted patient's discharge dated before its own
+    admission fails instead of matching the earlier stay
+    Previous discharges taken from staged discharges and earlier batches,
+    earlier batches kept only from lookback_days before the current
+    batch's earliest discharge (older rows cannot match), so the kept
+    table stays bounded by the window instead of growing per batch
+    Staged rows read for the batch's window only:
+    lookback_days before the earliest discharge to the latest,
+    reloaded when a batch falls outside the loaded window
+    Skipped when admissions are not staged
+
+    :param staged: Callable (event_type, start, end) returning staged
+        (patient_id, event_ts) with event_ts in window
+    :param lookback_days: Longest stay matched to an admission
+    :type lookback_days: int
+    :return: Checks by name
+    :rtype: dict
+    """
+
+    lookback = timedelta(days=lookback_days)
+    tolerance_ms = int(lookback.total_seconds() * 1000)
+    loaded = {}
+    seen = {}
+
+    def read(event_type: str, start: datetime, end: datetime) -> pa.Table | None:
+
+        try:
+            table = staged(event_type, start, end)
+        except FileNotFoundError:
+            return None
+
+        return pa.table({
+            "patient_id": pc.cast(table.column("patient_id"), pa.int64()),
+            "event_ts": pc.cast(table.column("event_ts"), STAGED_TS),
+        })
+
+    def window(start: datetime, end: datetime) -> dict:
+
+        if not loaded or start < loaded["start"] or end > loaded["end"]:
+            loaded.update(
+                admissions=read("admission", start, end),
+                discharges=read("discharge", start, end),
+                start=start,
+                end=end
+            )
+
+        return loaded
+
+    def check(t: pa.Table) -> pa.Array | None:
+
+        event_ts = parse_timestamps(t.column("event_ts"))
+        bounds = pc.min_max(event_ts).as_py()
+
+        if bounds["min"] is None:
+            return pa.array([False] * t.num_rows)
+
+        staged_window = window(bounds["min"] - lookback, bounds["max"])
+
+        if staged_window["admissions"] is None:
+            return None
+
+        batch = pa.table({
+            "patient_id": pc.fill_null(pc.cast(t.column("patient_id"), pa.int64()), -1),
+            "event_ts": pc.fill_null(event_ts, pa.scalar(0, STAGED_TS)),
+        })
+        left = batch.append_column("row", pa.array(np.arange(t.num_rows)))
+
+        admissions = staged_window["admissions"]
+        admission_ts = _asof_latest(
+            left,
+            admissions.append_column("admission_ts", admissions.column("event_ts")),
+            "admission_ts",
+            tolerance_ms
+        )
+
+        earliest = pa.scalar(bounds["min"] - lookback, STAGED_TS)
+        recent = pa.concat_tables([d for d in (seen.get("discharges"), batch) if d is not None])
+        seen["discharges"] = recent.filter(pc.greater_equal(recent.column("event_ts"), earliest))
+
+        discharges = pa.concat_tables(
+            [d for d in (staged_window["discharges"], seen["discharges"]) if d is not None]
+        )
+        previous_ts = _asof_latest( # keyed 1 ms later, so only strictly earlier discharges match
+            left,
+            pa.table({
+                "patient_id": discharges.column("patient_id"),
+                "event_ts": pc.add(discharges.column("event_ts"), pa.scalar(1, pa.duration("ms"))),
+                "previous_ts": discharges.column("event_ts"),
+            }),
+            "previous_ts",
+            tolerance_ms
+        )
+
+        return pc.fill_null(
+            pc.and_(
+                pc.and_(pc.is_valid(event_ts), pc.less(admission_ts, event_ts)),
+                pc.fill_null(pc.greater(admission_ts, previous_ts), True)
+            ),
+            False
+        )
+
+    return {"discharge_after_admission": check}
+
+def checks_for(event_type: str, schema: pa.Schema, staged) -> dict:
+
+    """
+    Checks for staging event type
+
+    :param event_type: Staging event type
+    :type event_type: str
+    :param schema: Staging schema
+    :type schema: pa.Schema
+    :param staged: Callable (event_type, start, end) returning staged rows in window
+    :return: Checks by name
+    :rtype: dict
+    """
+
+    checks = schema_checks(schema)
+
+    if event_type == "department_snapshot":
+        checks.update(bed_checks())
+
+    if event_type == "discharge":
+        checks.update(discharge_after_admission(staged))
+
+    return checks
+
+# --------------------------------------------------
+# Quality Gate
+# --------------------------------------------------
+
+class QualityGate:
+
+    def __init__(self, checks: dict):
+
+        """
+        Initialises gate for one staged partition
+
+        :param self: References class
+        :param checks: Checks by name
+        :type checks: dict
+        """
+
+        self.checks = checks
+        self.rows = 0
+        self.failures = {name: 0 for name in checks}
+        self.skipped = set()
+        self.quarantine = []
+
+    def apply(self, table: pa.Table) -> pa.Table:
+
+        """
+        Evaluates checks on batch, counts failures,
+        holds failing rows with failed check names for quarantine
+
+        :param self: References class
+        :param table: Pre-cast staged table
+        :type table: pa.Table
+        :return: Passing rows
+        :rtype: pa.Table
+        """
+
+        self.rows += table.num_rows
+        passed = None
+        failed = {}
+
+        for name, check in self.checks.items():
+
+            mask = check(table)
+
+            if mask is None:
+                self.skipped.add(name)
+                continue
+
+            fail_count = mask.length() - pc.sum(mask).as_py() if mask.length() else 0
+
+            if fail_count:
+                self.failures[name] += fail_count
+                failed[name] = mask
+
+            passed = mask if passed is None else pc.and_(passed, mask)
+
+        if not failed:
+            return table
+
+        rejected = pc.invert(passed)
+        reasons = pa.array([""] * table.num_rows)
+
+        for name, mask in failed.items():
+            reasons = pc.if_else(
+                mask,
+                reasons,
+                pc.binary_join_element_wise(reasons, name, ";")
+            )
+
+        self.quarantine.append(
+            table
+            .append_column("failed_checks", pc.utf8_ltrim(reasons, ";"))
+            .filter(rejected)
+        )
+
+        return table.filter(passed)
+
+    @property
+    def quarantined(self) -> int:
+        return sum(t.num_rows for t in self.quarantine)
+
+    def report(self, event_type: str, partition: str, part: str | None) -> dict:
+
+        """
+        Compact quality report for partition
+
+        :param self: References class
+        :param event_type: Staging event type
+        :type event_type: str
+        :param partition: Partition date - YYYY-MM || YYYY
+        :type partition: str
+        :param part: Part suffix, None for rebuild
+        :type part: str | None
+        :return: Report
+        :rtype: dict
+        """
+
+        return {
+            "event_type": event_type,
+            "partition": partition,
+            "part": part,
+            "rows": self.rows,
+            "passed": self.rows - self.quarantined,
+            "quarantined": self.quarantined,
+            "failures": self.failures,
+            "skipped": sorted(self.skipped),
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def write(self, fs: FileSystem, bucket: str, event_type: str, partition: str, part: str | None) -> dict:
+
+        """
+        Writes report to staging/_quality/event_type/partition=date/
+        and failing rows to staging/_quarantine/event_type/partition=date/
+        Rebuild (part None) clears the partition's reports and quarantine
+        first, so files from earlier incremental parts do not remain
+        Stale quarantine file from a previous run removed
+
+        :param self: References class
+        :param fs: Filesystem
+        :type fs: FileSystem
+        :param bucket: S3 Bucket
+        :type bucket: str
+        :param event_type: Staging event type
+        :type event_type: str
+        :param partition: Partition date - YYYY-MM || YYYY
+        :type partition: str
+        :param part: Part suffix, None for rebuild
+        :type part: str | None
+        :return: Report
+        :rtype: dict
+        """
+
+        file_name = event_type if part is None else f"{event_type}_{part}"
+        report_dir = f"{bucket}/staging/_quality/{event_type}/partition={partition}"
+        quarantine_dir = f"{bucket}/staging/_quarantine/{event_type}/partition={partition}"
+        quarantine_path = f"{quarantine_dir}/{file_name}.parquet"
+
+        report = self.report(event_type, partition, part)
+
+        if part is None:
+            for directory in (report_dir, quarantine_dir):
+                fs.delete_dir_contents(directory, missing_dir_ok=True)
+
+        fs.create_dir(report_dir, recursive=True)
+
+        with fs.open_output_stream(f"{report_dir}/{file_name}.json") as f:
+            f.write(json.dumps(report, indent=2).encode("utf-8"))
+
+        if self.quarantine:
+            fs.create_dir(quarantine_dir, recursive=True)
+            pap.write_table(
+                pa.concat_tables(self.quarantine, promote_options="permissive"),
+                quarantine_path,
+                filesystem=fs
+            )
+        elif fs.get_file_info(quarantine_path).type == FileType.File:
+            fs.delete_file(quarantine_path)
+
+        return report
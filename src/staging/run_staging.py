@@ -0,0 +1,301 @@
+"""
+Unified staging runner
+Builds (event_type, partition) tasks for every raw event type
+Runs tasks on a process pool
+Reports duration, rows and bytes per task
+"""
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pyarrow.fs import FileSystem
+from src.metrics import metrics
+from src.staging.manifest import Manifest
+from src.staging.schemas import encounter_schema, waiting_schema, department_schema
+from src.staging.staging_config import staging_bucket, staging_workers
+from src.staging.staging_department_snapshot import department_select, department_raw_schema
+from src.staging.staging_encounter import encounter_select, encounter_rename, encounter_raw_schema
+from src.staging.staging_utils import (
+    get_filesystem, get_partitions, plan_partitions,
+    build_parquet, staging_output_dir, open_manifest,
+)
+from src.staging.staging_wait_snapshot import waiting_select, waiting_raw_schema
+
+# --------------------------------------------------
+# Staging Jobs by Raw Event Type
+# --------------------------------------------------
+
+STAGING_JOBS = {
+    "admission": {
+        "event_type": "admission",
+        "schema": encounter_schema,
+        "raw_schema": encounter_raw_schema,
+        "select": encounter_select,
+        "rename": encounter_rename,
+        "isDepartment": False,
+    },
+    "discharge": {
+        "event_type": "discharge",
+        "schema": encounter_schema,
+        "raw_schema": encounter_raw_schema,
+        "select": encounter_select,
+        "rename": encounter_rename,
+        "isDepartment": False,
+    },
+    "wait_snapshot": {
+        "event_type": "waiting_list_snapshot",
+        "schema": waiting_schema,
+        "raw_schema": waiting_raw_schema,
+        "select": waiting_select,
+        "rename": waiting_select,
+        "isDepartment": False,
+    },
+    "dep_snapshot": {
+        "event_type": "department_snapshot",
+        "schema": department_schema,
+        "raw_schema": department_raw_schema,
+        "select": department_select,
+        "rename": department_select,
+        "isDepartment": True,
+    },
+}
+
+# --------------------------------------------------
+# Build Work List
+# --------------------------------------------------
+
+def build_tasks(
+        bucket: str,
+        raw_event_types: list[str],
+        date_type: str,
+        fs: FileSystem,
+        manifest: Manifest | None = None
+        ) -> list[dict]:
+
+    """
+    Lists each raw event type once and plans its partitions
+    Largest partitions first so the pool drains evenly
+    
+    :param bucket: S3 Bucket
+    :type bucket: str
+    :param raw_event_types: Raw event types to stage
+    :type raw_event_types: list[str]
+    :param date_type: month or year
+    :type date_type: str
+    :param fs: Filesystem
+    :type fs: FileSystem
+    :param manifest: Processed-object manifest, None for full rebuild
+    :type manifest: Manifest | None
+    :return: Tasks
+    :rtype: list[dict]
+    """
+
+    tasks = []
+
+    for raw_event_type in raw_event_types:
+
+        partitions = get_partitions(bucket, raw_event_type, date_type, fs)
+
+        for date, objects, part in plan_partitions(partitions, raw_event_type, manifest):
+            tasks.append({
+                "raw_event_type": raw_event_type,
+                "partition": date,
+                "objects": objects,
+                "raw_bytes": sum(f.size or 0 for f in objects),
+                "part": part,
+            })
+
+    tasks.sort(key=lambda t: t["raw_bytes"], reverse=True)
+
+    return tasks
+
+# --------------------------------------------------
+# Run Task
+# --------------------------------------------------
+
+def run_task(bucket: str, raw_event_type: str, partition: str, paths: list[str], part: str | None) -> dict:
+
+    """
+    Stages one partition, executed in worker process
+    Worker metrics returned for parent to merge
+    
+    :param bucket: S3 Bucket
+    :type bucket: str
+    :param raw_event_type: Raw event type
+    :type raw_event_type: str
+    :param partition: Partition date - YYYY-MM || YYYY
+    :type partition: str
+    :param paths: Raw object paths
+    :type paths: list[str]
+    :param part: Part suffix for appended file
+    :type part: str | None
+    :return: Rows, files, output bytes, seconds, metrics
+    :rtype: dict
+    """
+
+    job = STAGING_JOBS[raw_event_type]
+    fs = get_filesystem()
+
+    files = []
+    started = time.perf_counter()
+
+    rows = build_parquet(
+        bucket,
+        paths,
+        partition,
+        job["event_type"],
+        job["schema"],
+        job["select"],
+        job["rename"],
+        job["isDepartment"],
+        fs=fs,
+        raw_schema=job["raw_schema"],
+        part=part,
+        file_visitor=files.append
+    )
+
+    return {
+        "rows": rows,
+        "files": len(files),
+        "output_bytes": sum(f.size for f in files),
+        "seconds": time.perf_counter() - started,
+        "metrics": metrics.snapshot(reset=True),
+    }
+
+# --------------------------------------------------
+# Run Staging
+# --------------------------------------------------
+
+def run_staging(
+        bucket: str = staging_bucket,
+        raw_event_types: list[str] | None = None,
+        date_type: str = "month",
+        workers: int = staging_workers
+        ) -> list[dict]:
+
+    """
+    Stages every (event_type, partition) task on a process pool
+    Discharges run after other event types, quality gate
+    checks them against staged admissions
+    Manifest (STAGING_MANIFEST) updated by parent as tasks complete,
+    a failed task does not stop recording of the others,
+    failures raised together once every task has finished
+    
+    :param bucket: S3 Bucket
+    :type bucket: str
+    :param raw_event_types: Raw event types, defaults to all
+    :type raw_event_types: list[str] | None
+    :param date_type: month or year
+    :type date_type: str
+    :param workers: Worker processes
+    :type workers: int
+    :return: Per-task reports
+    :rtype: list[dict]
+    :raises RuntimeError: One or more tasks failed
+    """
+
+    raw_event_types = raw_event_types or list(STAGING_JOBS)
+    fs = get_filesystem()
+    reports = []
+    failures = []
+
+    with open_manifest() as manifest:
+
+        tasks = build_tasks(bucket, raw_event_types, date_type, fs, manifest)
+        waves = [
+            [t for t in tasks if t["raw_event_type"] != "discharge"],
+            [t for t in tasks if t["raw_event_type"] == "discharge"], # checked against staged admissions
+        ]
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+
+            for wave in waves:
+
+                futures = {
+                    pool.submit(
+                        run_task,
+                        bucket,
+                        task["raw_event_type"],
+                        task["partition"],
+                        [f.path for f in task["objects"]],
+                        task["part"]
+                    ): task
+                    for task in wave
+                }
+
+                for future in as_completed(futures):
+                    task = futures[future]
+
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        failures.append((task, e))
+                        print(f"[FAIL] {task['raw_event_type']} {task['partition']}: {e!r}")
+                        continue
+
+                    metrics.merge(result.pop("metrics"))
+                    event_type = STAGING_JOBS[task["raw_event_type"]]["event_type"]
+
+                    if manifest:
+                        manifest.record(
+                            task["raw_event_type"],
+                            task["partition"],
+                            task["objects"],
+                            staging_output_dir(bucket, event_type)
+                        )
+
+                    report = {
+                        "event_type": task["raw_event_type"],
+                        "partition": task["partition"],
+                        "objects": len(task["objects"]),
+                        "raw_bytes": task["raw_bytes"],
+                        **result,
+                    }
+                    reports.append(report)
+
+                    print(
+                        f"[OK] {report['event_type']} {report['partition']} "
+                        f"rows={report['rows']} objects={report['objects']} "
+                        f"raw_bytes={report['raw_bytes']} files={report['files']} output_bytes={report['output_bytes']} "
+                        f"{report['seconds']:.2f}s"
+                    )
+
+    if failures:
+        raise RuntimeError(
+            f"{len(failures)} staging tasks failed: "
+            + ", ".join(f"{task['raw_event_type']} {task['partition']}" for task, _ in failures)
+        ) from failures[0][1]
+
+    return reports
+
+# --------------------------------------------------
+# Entry Point
+# --------------------------------------------------
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Stage raw events to Parquet in parallel")
+    parser.add_argument("--bucket", default=staging_bucket)
+    parser.add_argument("--event-types", nargs="*", choices=list(STAGING_JOBS), default=None)
+    parser.add_argument("--date-type", choices=["month", "year"], default="month")
+    parser.add_argument("--workers", type=int, default=staging_workers)
+    args = parser.parse_args()
+
+    metrics.export_at_exit("run_staging")
+    started = time.perf_counter()
+
+    with metrics.timer("stage_seconds", stage="run_staging"):
+        reports = run_staging(args.bucket, args.event_types, args.date_type, args.workers)
+
+    print(
+        f"[OK] Staged {len(reports)} partitions, "
+        f"{sum(r['rows'] for r in reports)} rows in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -47,4 +47,4 @@ department_schema = pa.schema([
     pa.field("event_ts", pa.timestamp("ms", tz="UTC"), nullable=False),
     pa.field("source_system", pa.string(), nullable=False),
     pa.field("ingestion_ts", pa.timestamp("ms", tz="UTC"), nullable=False),
-])
\ No newline at end of file
+])
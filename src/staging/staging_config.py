@@ -0,0 +1,65 @@
+import os
+from dotenv import load_dotenv
+
+# --------------------------------------------------
+# Load environment variables
+# --------------------------------------------------
+
+load_dotenv()
+
+# --------------------------------------------------
+# Filesystem
+# --------------------------------------------------
+
+staging_fs = os.getenv("STAGING_FS", "s3") # s3 or local
+staging_local_root = os.getenv("STAGING_LOCAL_ROOT", "data") # local: directory holding buckets
+staging_s3_endpoint = os.getenv("STAGING_S3_ENDPOINT") # S3-compatible stand-in, unset = AWS
+
+# --------------------------------------------------
+# Buckets and prefixes
+# --------------------------------------------------
+
+staging_bucket = os.getenv("STAGING_BUCKET", "health-data-raw-elt")
+raw_prefix = os.getenv("STAGING_RAW_PREFIX", "raw")
+
+# --------------------------------------------------
+# Raw object fetching
+# --------------------------------------------------
+
+fetch_workers = int(os.getenv("STAGING_FETCH_WORKERS", "16"))
+fetch_retries = int(os.getenv("STAGING_FETCH_RETRIES", "3"))
+fetch_backoff = float(os.getenv("STAGING_FETCH_BACKOFF", "0.5"))
+
+# --------------------------------------------------
+# Parquet output
+# --------------------------------------------------
+
+row_group_size = int(os.getenv("STAGING_ROW_GROUP_SIZE", "131072"))
+max_rows_per_file = int(os.getenv("STAGING_MAX_ROWS_PER_FILE", "1048576"))
+partition_by_ward = os.getenv("STAGING_PARTITION_BY_WARD", "false").lower() == "true"
+
+# --------------------------------------------------
+# Data quality
+# --------------------------------------------------
+
+quality_gate = os.getenv("STAGING_QUALITY_GATE", "true").lower() == "true"
+admission_lookback_days = int(os.getenv("STAGING_ADMISSION_LOOKBACK_DAYS", "120")) # discharge matched to admission at most this far back
+
+# --------------------------------------------------
+# Incremental staging
+# --------------------------------------------------
+
+manifest_path = os.getenv("STAGING_MANIFEST") # unset = full rebuild
+manifest_lock_ttl = int(os.getenv("STAGING_MANIFEST_LOCK_TTL", str(6 * 3600))) # seconds before a remote manifest lock counts as stale
+
+# --------------------------------------------------
+# Staging runner
+# --------------------------------------------------
+
+staging_workers = int(os.getenv("STAGING_WORKERS", str(os.cpu_count() or 1)))
+
+# --------------------------------------------------
+# Raw compaction
+# --------------------------------------------------
+
+compact_target_bytes = int(os.getenv("COMPACT_TARGET_BYTES", str(256 * 1024 * 1024))) # uncompressed per object
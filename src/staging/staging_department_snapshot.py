@@ -1,44 +1,96 @@
 """
 Orchestration for creating department snapshot parquet
-S3 raw json parsed into rows before passing to PyArrow
+S3 raw json decoded by Arrow, ward structs exploded into rows
 Appended to S3 staging partitioned by YYYY-MM
 """
 
-from src.staging.staging_utils import get_prefixes, build_parquet
+import numpy as np
+import pyarrow as pa
+from src.metrics import metrics
+from src.staging.staging_utils import get_filesystem, open_manifest, projection_schema, stage_partitions
+from src.staging.staging_config import staging_bucket
 from src.staging.schemas import department_schema
 
 # --------------------------------------------------
-# Explode Department Snapshot Json
+# Explode Department Snapshots
 # --------------------------------------------------
 
-def explode_department_snapshot(event: dict) -> list[dict]:
+# Ward struct as Arrow decodes Department.to_dict,
+# exploded columns when a batch has no wards
+ward_type = pa.struct([
+    pa.field("name", pa.string()),
+    pa.field("beds_total", pa.int64()),
+    pa.field("beds_occupied", pa.int64()),
+    pa.field("beds_available", pa.int64()),
+])
+
+def explode_department_snapshots(raw: pa.Table) -> pa.Table:
 
     """
-    Explodes department snapshot json from
-    nested objects to single row
+    Explodes department snapshots from one row per snapshot
+    with nested departments struct (one field per ward)
+    to one row per ward per snapshot, in Arrow
+    Parent columns repeated with take, ward structs interleaved
+    so rows stay ordered by snapshot then ward
+    Wards missing from a snapshot are dropped
+    No wards (empty departments struct) gives an empty table
+    with the exploded columns (ward fields typed by ward_type)
     
-    :param event: Event json
-    :type event: dict
-    :return: List of rows by department
-    :rtype: list[dict]
+    :param raw: Raw snapshot table with departments struct column
+    :type raw: pa.Table
+    :return: One row per ward per snapshot
+    :rtype: pa.Table
     """
 
-    rows = []
+    departments = raw.column("departments").combine_chunks()
+    wards = [field.name for field in departments.type]
+
+    n = raw.num_rows
+    k = len(wards)
+
+    parent_index = pa.array(np.repeat(np.arange(n), k))
+    ward_index = pa.array(np.tile(np.arange(k), n))
+    row_major = pa.array(
+        (np.arange(n)[:, None] + n * np.arange(k)[None, :]).ravel()
+    )
 
-    for ward_name, ward in event["departments"].items():
-        rows.append({
-            "event_type": event["event_type"],
-            "ward_name": ward_name,
-            "beds_total": ward["beds_total"],
-            "beds_occupied": ward["beds_occupied"],
-            "beds_available": ward["beds_available"],
-            "phase": event["phase"],
-            "event_ts": event["event_ts"],
-            "source_system": event["source_system"],
-            "ingestion_ts": event["ingestion_ts"],
-        })
+    if k:
+        ward_rows = pa.concat_arrays(
+            [departments.field(i) for i in range(k)]
+        ).take(row_major)
+    else:
+        ward_rows = pa.array([], ward_type)
 
-    return rows
+    columns = {
+        name: raw.column(name).take(parent_index)
+        for name in raw.column_names
+        if name != "departments"
+    }
+    columns["ward_name"] = pa.array(wards, pa.string()).take(ward_index)
+
+    for field in ward_rows.type:
+        if field.name != "name":
+            columns[field.name] = ward_rows.field(field.name)
+
+    return pa.table(columns).filter(ward_rows.is_valid())
+
+# --------------------------------------------------
+# Department Snapshot Fields
+# --------------------------------------------------
+
+department_select = [
+    "event_type",
+    "ward_name",
+    "beds_total",
+    "beds_occupied",
+    "beds_available",
+    "phase",
+    "event_ts",
+    "source_system",
+    "ingestion_ts",
+]
+ward_fields = ("ward_name", "beds_total", "beds_occupied", "beds_available") # from exploded departments
+department_raw_schema = projection_schema(department_select, department_select, department_schema, ward_fields)
 
 # --------------------------------------------------
 # Entry Point
@@ -46,30 +98,22 @@ def explode_department_snapshot(event: dict) -> list[dict]:
 
 def main():
 
-    department_select = [
-        "event_type",
-        "ward_name",
-        "beds_total",
-        "beds_occupied",
-        "beds_available",
-        "phase",
-        "event_ts",
-        "source_system",
-        "ingestion_ts",
-    ]
-
-    department_prefixes = get_prefixes("dep_snapshot", "month")
-
-    for month, prefixes in department_prefixes.items():
-        build_parquet(
-            "health-data-raw-elt",
-            prefixes,
-            month,
+    metrics.export_at_exit("staging_department_snapshot")
+    fs = get_filesystem()
+
+    with open_manifest() as manifest, metrics.timer("stage_seconds", stage="staging_department_snapshot"):
+
+        stage_partitions(
+            staging_bucket,
+            "dep_snapshot",
             "department_snapshot",
             department_schema,
             department_select,
             department_select,
-            True
+            True,
+            department_raw_schema,
+            fs=fs,
+            manifest=manifest
         )
 
 
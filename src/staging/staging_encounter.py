@@ -6,63 +6,74 @@ Appended to S3 staging
 Partitioned by YYYY-MM
 """
 
-from src.staging.staging_utils import get_prefixes, build_parquet
+from src.metrics import metrics
+from src.staging.staging_utils import get_filesystem, open_manifest, projection_schema, stage_partitions
+from src.staging.staging_config import staging_bucket
 from src.staging.schemas import encounter_schema
 
+# --------------------------------------------------
+# Encounter Fields
+# --------------------------------------------------
+
+encounter_select = [
+    "event_type",
+    "patient.patient_id",
+    "patient.gender",
+    "encounter.department",
+    "encounter.waiting_list",
+    "encounter.waiting_time",
+    "event_ts",
+    "ingestion_ts",
+    "source_system",
+]
+encounter_rename = [
+    "event_type",
+    "patient_id",
+    "patient_gender",
+    "department_name",
+    "waiting_list",
+    "waiting_time",
+    "event_ts",
+    "ingestion_ts",
+    "source_system",
+]
+encounter_raw_schema = projection_schema(encounter_select, encounter_rename, encounter_schema)
+
 # --------------------------------------------------
 # Entry Point
 # --------------------------------------------------
 
 def main():
 
-    select = [
-        "event_type",
-        "patient.patient_id",
-        "patient.gender",
-        "encounter.department",
-        "encounter.waiting_list",
-        "encounter.waiting_time",
-        "event_ts",
-        "ingestion_ts",
-        "source_system",
-    ]
-    rename = [
-        "event_type",
-        "patient_id",
-        "patient_gender",
-        "department_name",
-        "waiting_list",
-        "waiting_time",
-        "event_ts",
-        "ingestion_ts",
-        "source_system",
-    ]
+    metrics.export_at_exit("staging_encounter")
+    fs = get_filesystem()
 
-    admission_prefixes = get_prefixes("admission", "month")
-    discharge_prefixes = get_prefixes("discharge", "month")
+    with open_manifest() as manifest, metrics.timer("stage_seconds", stage="staging_encounter"):
 
-    for month, prefixes in admission_prefixes.items():
-        build_parquet(
-            "health-data-raw-elt",
-            prefixes,
-            month,
+        stage_partitions(
+            staging_bucket,
+            "admission",
             "admission",
             encounter_schema,
-            select,
-            rename,
-            False
+            encounter_select,
+            encounter_rename,
+            False,
+            encounter_raw_schema,
+            fs=fs,
+            manifest=manifest
         )
 
-    for month, prefixes in discharge_prefixes.items():
-        build_parquet(
-            "health-data-raw-elt",
-            prefixes,
-            month,
+        stage_partitions(
+            staging_bucket,
+            "discharge",
             "discharge",
             encounter_schema,
-            select,
-            rename,
-            False
+            encounter_select,
+            encounter_rename,
+            False,
+            encounter_raw_schema,
+            fs=fs,
+            manifest=manifest
         )
 
 
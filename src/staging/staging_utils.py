@@ -1,185 +1,677 @@
 """
 Helper functions for orchestration, normalising fields,
-returning S3 prefixes, grouping prefixes
+listing raw objects, grouping objects by partition
 """
 
+import hashlib
+import json
+import os
 import re
+import time
 import pyarrow as pa
-import pyarrow.parquet as pap
-import json
-from pyarrow.fs import S3FileSystem, FileSelector
-from src.raw.ingestion.s3config import client
-from src.staging.staging_department_snapshot import explode_department_snapshot
-from collections import defaultdict
-from datetime import datetime, timezone
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.json as pj
+from pyarrow.fs import S3FileSystem, LocalFileSystem, SubTreeFileSystem, FileSelector, FileSystem, FileInfo, FileType
+from src.metrics import metrics
+from src.staging.manifest import Manifest
+from src.staging.quality import QualityGate, checks_for
+from src.staging.staging_config import (
+    fetch_workers, fetch_retries, fetch_backoff, row_group_size,
+    max_rows_per_file, partition_by_ward, manifest_path, raw_prefix, quality_gate,
+    staging_fs, staging_local_root, staging_s3_endpoint,
+)
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
 
 # --------------------------------------------------
-# List Daily Prefixes
+# Shared Filesystem
 # --------------------------------------------------
 
-def list_daily_prefixes(bucket: str, prefix: str) -> list[str]:
+_fs = None
+
+def get_filesystem() -> FileSystem:
 
     """
-    Return S3 prefixes
+    Returns filesystem shared across the staging run
+    STAGING_FS=s3 -> S3FileSystem (STAGING_S3_ENDPOINT override)
+    STAGING_FS=local -> directory STAGING_LOCAL_ROOT stands in for S3,
+    buckets are its subdirectories
     
-    :param bucket: Bucket name
+    :return: Filesystem
+    :rtype: FileSystem
+    """
+
+    global _fs
+
+    if _fs is None:
+        if staging_fs == "local":
+            os.makedirs(staging_local_root, exist_ok=True)
+            _fs = SubTreeFileSystem(os.path.abspath(staging_local_root), LocalFileSystem())
+        else:
+            _fs = S3FileSystem(endpoint_override=staging_s3_endpoint)
+
+    return _fs
+
+# --------------------------------------------------
+# List Raw Days
+# --------------------------------------------------
+
+COMPACTED_DIR = "compacted"
+COMPACTED_MARKER = "_COMPACTED"
+
+def raw_root(bucket: str, prefix: str = raw_prefix) -> str:
+
+    """
+    Returns raw layer root, bucket itself when prefix is empty
+    (raw writer keys at bucket root)
+
+    :param bucket: S3 Bucket
     :type bucket: str
-    :param prefix: Prefix path
+    :param prefix: Raw prefix (STAGING_RAW_PREFIX)
     :type prefix: str
-    :return: List of partitions
-    :rtype: list[str]
+    :return: bucket/prefix || bucket
+    :rtype: str
+    """
+
+    prefix = prefix.strip("/")
+
+    return f"{bucket}/{prefix}" if prefix else bucket
+
+def list_raw_days(fs: FileSystem, base_dir: str) -> dict[str, dict]:
+
     """
+    Lists every raw object under base_dir in one recursive listing
+    Groups by event_date=YYYY-MM-DD directory into
+    original NDJSON objects, compacted objects and compaction marker,
+    marker of compacted days read for its committed generations
+    
+    :param fs: Filesystem
+    :type fs: FileSystem
+    :param base_dir: bucket/raw/event_type
+    :type base_dir: str
+    :return: {day_dir: {"originals", "compacted", "marker", "state"}}
+    :rtype: dict[str, dict]
+    """
+
+    selector = FileSelector(
+        base_dir = base_dir,
+        recursive = True,
+        allow_not_found = True
+    )
+
+    days = defaultdict(lambda: {"originals": [], "compacted": [], "marker": None, "state": None})
+
+    for f in fs.get_file_info(selector):
 
-    paginator = client.get_paginator("list_objects_v2")
+        if f.type != FileType.File:
+            continue
 
-    prefixes = set()
+        match = re.search(r'^(.*/event_date=\d{4}-\d{2}-\d{2})/(.+)$', f.path)
 
-    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
-        
-        for prefix in page.get("CommonPrefixes", []):
-            prefixes.add(prefix["Prefix"])
+        if match is None:
+            continue
 
-    return sorted(prefixes)
+        day_dir, name = match.groups()
+
+        if name == COMPACTED_MARKER:
+            days[day_dir]["marker"] = f
+        elif name.startswith(f"{COMPACTED_DIR}/") and name.endswith(".json.gz"):
+            days[day_dir]["compacted"].append(f)
+        elif name.endswith(".json"):
+            days[day_dir]["originals"].append(f)
+
+    for day in days.values():
+        day["state"] = read_marker(fs, day["marker"])
+
+    return dict(days)
+
+def read_marker(fs: FileSystem, marker: FileInfo | None) -> dict:
+
+    """
+    Reads compaction marker, empty state if day not compacted
+    Each generation records its compacted objects and
+    the original objects (sources) they replace
+
+    :param fs: Filesystem
+    :type fs: FileSystem
+    :param marker: Marker file
+    :type marker: FileInfo | None
+    :return: {"generations": [...]}
+    :rtype: dict
+    """
+
+    if marker is None:
+        return {"generations": []}
+
+    with fs.open_input_stream(marker.path) as f:
+        return json.loads(f.read())
+
+def committed_paths(day: dict, key: str) -> set[str]:
+
+    """
+    Paths committed by day's marker across generations
+
+    :param day: Day entry from list_raw_days
+    :type day: dict
+    :param key: objects (compacted) or sources (originals)
+    :type key: str
+    :return: Paths
+    :rtype: set[str]
+    """
+
+    return {path for generation in day["state"]["generations"] for path in generation[key]}
+
+def effective_objects(day: dict) -> list[FileInfo]:
+
+    """
+    Returns objects to read for a raw day
+    No marker -> original objects
+    Marker -> compacted objects committed by marker
+    and original objects not among its sources
+    (arrived after listing or after marker)
+    
+    :param day: Day entry from list_raw_days
+    :type day: dict
+    :return: Objects to read
+    :rtype: list[FileInfo]
+    """
+
+    if day["marker"] is None:
+        return day["originals"]
+
+    objects = committed_paths(day, "objects")
+    sources = committed_paths(day, "sources")
+
+    return (
+        [f for f in day["compacted"] if f.path in objects]
+        + [f for f in day["originals"] if f.path not in sources]
+    )
 
 # --------------------------------------------------
-# Group Prefixes by Date
+# List Partitions
 # --------------------------------------------------
 
-def group_prefixes_by_date(prefixes: list[str], date_type: str) -> defaultdict[str: list[str]]:
+def list_partitions(fs: FileSystem, base_dir: str, date_type: str) -> dict[str, list[FileInfo]]:
 
     """
-    Groups prefixes by date: YYYY-MM/YYYY
+    Lists raw objects under base_dir (see list_raw_days)
+    Compacted days read from compacted objects
+    Groups objects by event_date: YYYY-MM/YYYY
+    FileInfo carries path, size and mtime
     
-    :param prefixes: List of prefixes from S3 
-    :type prefixes: list[str]
+    :param fs: Filesystem
+    :type fs: FileSystem
+    :param base_dir: bucket/raw/event_type
+    :type base_dir: str
     :param date_type: month or year
     :type date_type: str
-    :return: Dict of date prefixes
-    :rtype: defaultdict
+    :return: Objects by partition, sorted by date then path
+    :rtype: dict[str, list[FileInfo]]
     """
 
-    grouped_prefix = defaultdict(list)
+    grouped = defaultdict(list)
 
-    for prefix in prefixes:
+    for day_dir, day in list_raw_days(fs, base_dir).items():
 
-        if date_type == "month":    
-            date = re.search(r'\d{4}-\d{2}', prefix).group()
+        match = re.search(r'event_date=(\d{4})-(\d{2})', day_dir)
+
+        if date_type == "month":
+            date = f"{match.group(1)}-{match.group(2)}"
         else:
-            date = re.search(r'\d{4}', prefix).group()
+            date = match.group(1)
 
-        grouped_prefix[date].append(prefix)
+        grouped[date].extend(effective_objects(day))
 
-    return grouped_prefix
+    return {
+        date: sorted(objects, key=lambda f: f.path)
+        for date, objects in sorted(grouped.items())
+        if objects
+    }
 
 # --------------------------------------------------
-# Get Objects at S3 Prefix
+# Projection Parse Schema
 # --------------------------------------------------
 
-def get_objects_at_prefix(prefix: str) -> list[str]:
+def projection_schema(
+        select: list[str],
+        rename: list[str],
+        schema: pa.Schema,
+        exclude: tuple[str, ...] = ()
+        ) -> pa.Schema:
 
     """
-    Returns list of objects at given prefix
+    Builds raw parse schema from select paths and target schema
+    Only projected paths are decoded, nested by dotted path
+    (patient.patient_id -> patient struct with patient_id)
+    Types taken from renamed target field:
+    timestamps parsed as strings (see normalise_timestamps),
+    integers widened to int64 so range is checked on cast
+    Every field nullable, only a type change fails the read (schema drift),
+    absent or null required fields are left to the quality gate
     
-    :param prefix: Prefix
-    :type prefix: str
-    :return: List of objects
-    :rtype: list[str]
+    :param select: Json fields to select from raw
+    :type select: list[str]
+    :param rename: Rename raw fields
+    :type rename: list[str]
+    :param schema: Staging schema
+    :type schema: pa.Schema
+    :param exclude: Target fields not read from raw (e.g. exploded)
+    :type exclude: tuple[str, ...]
+    :return: Raw parse schema
+    :rtype: pa.Schema
     """
 
-    fs = S3FileSystem()
+    tree = {}
 
-    selector = FileSelector(
-        base_dir = prefix,
-        recursive = True
-    )
+    for path, name in zip(select, rename):
+
+        if name in exclude:
+            continue
 
-    files = fs.get_file_info(selector)
+        field = schema.field(name)
+
+        if pa.types.is_timestamp(field.type):
+            field_type = pa.string()
+        elif pa.types.is_integer(field.type):
+            field_type = pa.int64()
+        else:
+            field_type = field.type
 
-    keys = [
-        f.path for f in files
-        if f.path.endswith(".json")
-    ]
+        *parents, leaf = path.split(".")
+        node = tree
 
-    return keys
+        for parent in parents:
+            node = node.setdefault(parent, {})
+
+        node[leaf] = pa.field(leaf, field_type)
+
+    def to_fields(node: dict) -> list[pa.Field]:
+
+        fields = []
+
+        for name, child in node.items():
+            if isinstance(child, dict):
+                children = to_fields(child)
+                fields.append(pa.field(name, pa.struct(children)))
+            else:
+                fields.append(child)
+
+        return fields
+
+    return pa.schema(to_fields(tree))
 
 # --------------------------------------------------
 # Return PyArrow Table
 # --------------------------------------------------
 
-def get_raw_object(fs: S3FileSystem, object: str, isDepartment: bool) -> pa.Table:
+def get_raw_object(
+        fs: S3FileSystem,
+        object: str,
+        isDepartment: bool,
+        raw_schema: pa.Schema | None = None
+        ) -> pa.Table:
 
     """
     Get raw json from S3
-    Normalise timestamps 
-    Explode if department snapshot
+    Object holds one event per line (NDJSON), gzip if compacted
+    Decoded in bulk by Arrow's JSON reader using raw parse schema
+    (see projection_schema), unprojected fields skipped
+    Department snapshot wards are inferred, ward names vary
+    Type changes raise ValueError
     
     :param fs: S3 Filesystem
     :type fs: S3FileSystem
     :param object: Raw json object
     :type object: str
-    :param isDepartment: isDepartment -> explode nested objects
+    :param isDepartment: isDepartment -> infer nested ward objects
     :type isDepartment: bool
+    :param raw_schema: Raw parse schema, None infers all fields
+    :type raw_schema: pa.Schema | None
     :return: PyArrow table
     :rtype: Any
     """
 
-    with fs.open_input_file(object) as f:
-        payload = json.loads(f.read().decode("utf-8"))
+    with metrics.timer("staging_object_read_seconds"), fs.open_input_stream(object) as f: # .gz decompressed by extension
+        data = f.read()
 
-    payload["event_ts"] = normalise_timestamp(payload["event_ts"])
-    payload["ingestion_ts"] = normalise_timestamp(payload["ingestion_ts"])
+    metrics.inc("staging_objects_read_total")
+    metrics.inc("staging_bytes_read_total", len(data))
+
+    parse_options = pj.ParseOptions(
+        explicit_schema=raw_schema,
+        unexpected_field_behavior="infer" if isDepartment else "ignore"
+    )
+
+    try:
+        with metrics.timer("staging_object_decode_seconds"):
+            return pj.read_json(pa.BufferReader(data), parse_options=parse_options)
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Raw schema drift in {object}: {e}") from e
+
+# --------------------------------------------------
+# Fetch Raw Objects Concurrently
+# --------------------------------------------------
+
+def get_raw_object_with_retry(
+        fs: S3FileSystem,
+        object: str,
+        isDepartment: bool,
+        raw_schema: pa.Schema | None,
+        retries: int
+        ) -> pa.Table:
+
+    """
+    get_raw_object with exponential backoff on I/O errors
+    
+    :param fs: S3 Filesystem
+    :type fs: S3FileSystem
+    :param object: Raw json object
+    :type object: str
+    :param isDepartment: isDepartment -> infer nested ward objects
+    :type isDepartment: bool
+    :param raw_schema: Raw parse schema
+    :type raw_schema: pa.Schema | None
+    :param retries: Attempts after first failure
+    :type retries: int
+    :return: PyArrow table
+    :rtype: pa.Table
+    """
+
+    for attempt in range(retries + 1):
+        try:
+            return get_raw_object(fs, object, isDepartment, raw_schema)
+        except OSError:
+            if attempt == retries:
+                raise
+            metrics.inc("staging_object_retries_total")
+            time.sleep(fetch_backoff * 2 ** attempt)
+
+def fetch_raw_objects(
+        fs: S3FileSystem,
+        objects: list[str],
+        isDepartment: bool,
+        raw_schema: pa.Schema | None = None,
+        workers: int = fetch_workers,
+        retries: int = fetch_retries
+        ):
+
+    """
+    Fetches and decodes raw objects on a bounded thread pool
+    sharing one filesystem
+    Yields decoded tables in object order as they complete,
+    at most 2 x workers objects in flight
+    
+    :param fs: S3 Filesystem
+    :type fs: S3FileSystem
+    :param objects: Raw json objects
+    :type objects: list[str]
+    :param isDepartment: isDepartment -> infer nested ward objects
+    :type isDepartment: bool
+    :param raw_schema: Raw parse schema
+    :type raw_schema: pa.Schema | None
+    :param workers: Concurrent fetches
+    :type workers: int
+    :param retries: Attempts after first failure per object
+    :type retries: int
+    """
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        in_flight = deque()
+
+        for object in objects:
+            in_flight.append(pool.submit(
+                get_raw_object_with_retry, fs, object, isDepartment, raw_schema, retries
+            ))
+
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+
+        while in_flight:
+            yield in_flight.popleft().result()
+
+# --------------------------------------------------
+# Stage Raw Table
+# --------------------------------------------------
+
+def stage_table(
+        raw: pa.Table,
+        schema: pa.schema,
+        select: list[str],
+        rename: list[str],
+        isDepartment: bool,
+        gate: QualityGate | None = None
+        ) -> pa.Table:
+
+    """
+    Explodes department snapshots, flattens, selects, renames,
+    drops rows failing quality gate, normalises timestamps
+    and casts raw table
+    Gate sees timestamps as raw strings, unparseable ones quarantined
+    Called once per batch
+    
+    :param raw: Raw decoded table
+    :type raw: pa.Table
+    :param schema: PyArrow schema
+    :type schema: pa.schema
+    :param select: Json fields to select from raw
+    :type select: list[str]
+    :param rename: Rename raw fields
+    :type rename: list[str]
+    :param isDepartment: isDepartment -> explode nested objects
+    :type isDepartment: bool
+    :param gate: Quality gate, None skips checks
+    :type gate: QualityGate | None
+    :return: Staged table
+    :rtype: pa.Table
+    """
+
+    from src.staging.staging_department_snapshot import explode_department_snapshots
 
     if isDepartment:
-        rows = explode_department_snapshot(payload) 
-    else:
-        rows = [payload]                              
+        raw = explode_department_snapshots(raw)
+
+    staged = (
+        raw
+        .flatten()
+        .select(select)
+        .rename_columns(rename)
+    )
 
-    return pa.Table.from_pylist(rows)
+    if gate is not None:
+        staged = gate.apply(staged)
+
+    return normalise_timestamps(staged, ("event_ts", "ingestion_ts")).cast(schema)
 
 # --------------------------------------------------
-# Group Event Prefixes From S3
+# Group Event Objects From S3
 # --------------------------------------------------
 
-def get_prefixes(event_type: str, date_type: str) -> defaultdict[str: list[str]]:
+def get_partitions(
+        bucket: str,
+        event_type: str,
+        date_type: str,
+        fs: FileSystem | None = None
+        ) -> dict[str, list[FileInfo]]:
 
     """
-    Returns a dictionary of prefixes grouped by date
+    Returns a dictionary of raw objects grouped by date
     
-    :return: Grouped prefixes
-    :rtype: defaultdict
+    :param bucket: S3 Bucket
+    :type bucket: str
+    :param event_type: Raw event type
+    :type event_type: str
+    :param date_type: month or year
+    :type date_type: str
+    :param fs: Filesystem, defaults to shared S3 filesystem
+    :type fs: FileSystem | None
+    :return: Grouped objects
+    :rtype: dict[str, list[FileInfo]]
     """
 
-    prefixes = list_daily_prefixes("health-data-raw-elt", f"raw/{event_type}/")
+    fs = fs or get_filesystem()
 
-    return group_prefixes_by_date(prefixes, date_type)
+    return list_partitions(fs, f"{raw_root(bucket)}/{event_type}", date_type)
+
+# --------------------------------------------------
+# Staging Dataset Layout
+# --------------------------------------------------
+
+WARD_COLUMNS = ("ward_name", "department_name")
+
+def staging_partitioning(schema: pa.Schema, by_ward: bool = partition_by_ward) -> ds.Partitioning:
+
+    """
+    Hive partitioning for staging datasets: year=YYYY/month=M
+    Optionally ward (ward_name/department_name) below month
+    
+    :param schema: Staging schema
+    :type schema: pa.Schema
+    :param by_ward: Partition by ward when schema has a ward column
+    :type by_ward: bool
+    :return: Hive partitioning
+    :rtype: ds.Partitioning
+    """
+
+    fields = [pa.field("year", pa.int16()), pa.field("month", pa.int8())]
+
+    if by_ward:
+        fields += [schema.field(c) for c in WARD_COLUMNS if c in schema.names]
+
+    return ds.partitioning(pa.schema(fields), flavor="hive")
+
+def staging_output_dir(bucket: str, event_type: str) -> str:
+
+    """
+    Returns staging dataset directory for event type
+    
+    :param bucket: S3 Bucket
+    :type bucket: str
+    :param event_type: Staging event type
+    :type event_type: str
+    :return: bucket/staging/event_type
+    :rtype: str
+    """
+
+    return f"{bucket}/staging/{event_type}"
+
+def open_staged_dataset(bucket: str, event_type: str, fs: FileSystem | None = None) -> ds.Dataset:
+
+    """
+    Opens staging dataset with hive partitioning
+    Filters on year/month (and ward) prune partitions before reading
+    
+    :param bucket: S3 Bucket
+    :type bucket: str
+    :param event_type: Staging event type
+    :type event_type: str
+    :param fs: Filesystem, defaults to shared S3 filesystem
+    :type fs: FileSystem | None
+    :return: Dataset
+    :rtype: ds.Dataset
+    """
+
+    return ds.dataset(
+        staging_output_dir(bucket, event_type),
+        format="parquet",
+        partitioning="hive",
+        filesystem=fs or get_filesystem()
+    )
+
+def read_staged_window(
+        bucket: str,
+        event_type: str,
+        start: datetime,
+        end: datetime,
+        columns: list[str],
+        fs: FileSystem | None = None
+        ) -> pa.Table:
+
+    """
+    Reads staged rows with event_ts in [start, end]
+    Only year/month partitions overlapping the window are scanned
+
+    :param bucket: S3 Bucket
+    :type bucket: str
+    :param event_type: Staging event type
+    :type event_type: str
+    :param start: Window start (UTC)
+    :type start: datetime
+    :param end: Window end (UTC)
+    :type end: datetime
+    :param columns: Columns to read
+    :type columns: list[str]
+    :param fs: Filesystem, defaults to shared S3 filesystem
+    :type fs: FileSystem | None
+    :return: Rows in window
+    :rtype: pa.Table
+    """
+
+    months = None
+    year, month = start.year, start.month
+
+    while (year, month) <= (end.year, end.month):
+        expression = (ds.field("year") == year) & (ds.field("month") == month)
+        months = expression if months is None else months | expression
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    return open_staged_dataset(bucket, event_type, fs).to_table(
+        columns=columns,
+        filter=months
+        & (ds.field("event_ts") >= pa.scalar(start, pa.timestamp("ms", tz="UTC")))
+        & (ds.field("event_ts") <= pa.scalar(end, pa.timestamp("ms", tz="UTC")))
+    )
 
 # --------------------------------------------------
 # Build Parquet
 # --------------------------------------------------
 
+OBJECT_COUNT_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+metrics.ratio("staging_rows_per_second", "staging_rows_total", "staging_seconds_total")
+
 def build_parquet(
         bucket: str, 
-        daily_prefixes: list[str], 
+        paths: list[str], 
         date: str, 
         event_type: str,
         schema: pa.schema,
         select: list[str],
         rename: list[str],
-        isDepartment: bool
-        ):
+        isDepartment: bool,
+        fs: FileSystem | None = None,
+        raw_schema: pa.Schema | None = None,
+        row_group_size: int = row_group_size,
+        part: str | None = None,
+        max_rows_per_file: int = max_rows_per_file,
+        partitioning: ds.Partitioning | None = None,
+        file_visitor=None,
+        quality_gate: bool = quality_gate
+        ) -> int:
     
     """
-    Takes list of daily prefixes, gets S3 raw objects 
-    Parses raw json object, normalises timestamps, 
-    explodes nested json for department snapshots
-    Flattens raw json object for parquet
-    Casts to parquet schema, enforcing types
-    Creates tables and appends to S3 staging
+    Takes list of raw objects in partition
+    Objects fetched concurrently (STAGING_FETCH_WORKERS)
+    Decodes raw NDJSON objects in bulk with Arrow's JSON reader
+    Decoded tables buffered up to row_group_size rows, then per batch:
+    normalises timestamps, 
+    explodes nested json for department snapshots,
+    flattens raw table for parquet,
+    casts to parquet schema, enforcing types
+    Batches streamed to staging dataset through write_dataset,
+    hive partitioned by event_ts year/month (see staging_partitioning),
+    memory bounded by row group size, not partition size
+    Files split at max_rows_per_file, named
+    {event_type}-{i}.parquet, rebuilds replace touched partitions
+    Incremental runs add {event_type}_{part}-{i}.parquet files
+    Quality gate (STAGING_QUALITY_GATE) quarantines failing rows,
+    writes per-partition report (see quality.QualityGate)
     
     :param bucket: S3 Bucket
     :type bucket: str
-    :param daily_prefixes: List of prefixes returned from S3 raw
-    :type daily_prefixes: list[str]
+    :param paths: Raw object paths in partition
+    :type paths: list[str]
     :param date: Partition date - YYYY-MM || YYYY
     :type date: str
     :param event_type: Used for S3 staging partition 
@@ -192,65 +684,289 @@ def build_parquet(
     :type rename: list[str]
     :param isDepartment: Determine if event is a department snapshot
     :type isDepartment: bool
+    :param fs: Filesystem, defaults to shared S3 filesystem
+    :type fs: FileSystem | None
+    :param raw_schema: Raw parse schema, None infers all fields
+    :type raw_schema: pa.Schema | None
+    :param row_group_size: Target rows per row group
+    :type row_group_size: int
+    :param part: Part suffix for appended files, None rebuilds partitions
+    :type part: str | None
+    :param max_rows_per_file: Rows per file before rolling to next file
+    :type max_rows_per_file: int
+    :param partitioning: Dataset partitioning, defaults to staging_partitioning
+    :type partitioning: ds.Partitioning | None
+    :param file_visitor: Called with each written file (path, size)
+    :param quality_gate: Run quality checks before writing
+    :type quality_gate: bool
+    :return: Rows written
+    :rtype: int
     """
 
-    tables = []
+    fs = fs or get_filesystem()
+    partitioning = partitioning or staging_partitioning(schema)
+    started = time.perf_counter()
+
+    output_schema = schema.append(pa.field("year", pa.int16())).append(pa.field("month", pa.int8()))
+    rows_written = 0
+
+    gate = None
+
+    if quality_gate:
+        gate = QualityGate(checks_for(
+            event_type,
+            schema,
+            lambda staged_type, start, end: read_staged_window(
+                bucket, staged_type, start, end, ["patient_id", "event_ts"], fs
+            )
+        ))
+
+    def stage_pending(pending: list[pa.Table]) -> pa.Table:
+
+        raw = pa.concat_tables(pending, promote_options="permissive")
+        staged = stage_table(raw, schema, select, rename, isDepartment, gate)
+        event_ts = staged.column("event_ts")
+
+        return (
+            staged
+            .append_column(output_schema.field("year"), pc.cast(pc.year(event_ts), pa.int16()))
+            .append_column(output_schema.field("month"), pc.cast(pc.month(event_ts), pa.int8()))
+        )
+
+    def staged_batches():
+
+        nonlocal rows_written
+        pending = []
+        pending_rows = 0
+
+        for raw in fetch_raw_objects(fs, paths, isDepartment, raw_schema):
+
+            pending.append(raw)
+            pending_rows += raw.num_rows
+
+            if pending_rows >= row_group_size:
+                staged = stage_pending(pending)
+                rows_written += staged.num_rows
+                yield from staged.to_batches()
+                pending = []
+                pending_rows = 0
+
+        if pending:
+            staged = stage_pending(pending)
+            rows_written += staged.num_rows
+            yield from staged.to_batches()
+
+    basename = event_type if part is None else f"{event_type}_{part}"
+
+    ds.write_dataset(
+        pa.RecordBatchReader.from_batches(output_schema, staged_batches()),
+        staging_output_dir(bucket, event_type),
+        format="parquet",
+        partitioning=partitioning,
+        basename_template=f"{basename}-{{i}}.parquet",
+        filesystem=fs,
+        file_options=ds.ParquetFileFormat().make_write_options(compression="snappy", use_dictionary=True),
+        preserve_order=True,
+        max_rows_per_file=max_rows_per_file,
+        min_rows_per_group=min(row_group_size, max_rows_per_file),
+        max_rows_per_group=min(row_group_size, max_rows_per_file),
+        file_visitor=file_visitor,
+        existing_data_behavior="delete_matching" if part is None else "overwrite_or_ignore"
+    )
 
-    fs = S3FileSystem()
+    print(f"[OK] Writing Parquet To S3 for {event_type} {date}")
 
-    for prefix in daily_prefixes:
+    seconds = time.perf_counter() - started
+    metrics.inc("staging_rows_total", rows_written, event_type=event_type)
+    metrics.inc("staging_partitions_total", event_type=event_type)
+    metrics.observe("staging_partition_seconds", seconds, event_type=event_type)
+    metrics.observe("staging_partition_objects", len(paths), OBJECT_COUNT_BUCKETS, event_type=event_type)
+    metrics.inc("staging_seconds_total", seconds, event_type=event_type)
 
-        s3_prefix = f"{bucket}/{prefix}"
-        objects_at_prefix = get_objects_at_prefix(s3_prefix)
+    if gate is not None:
+        report = gate.write(fs, bucket, event_type, date, part)
+        metrics.inc("staging_quarantined_rows_total", report["quarantined"], event_type=event_type)
 
-        for object in objects_at_prefix:
+        if report["quarantined"]:
+            failures = {name: n for name, n in report["failures"].items() if n}
+            print(f"[WARN] Quarantined {report['quarantined']} rows for {event_type} {date}: {failures}")
 
-            raw = get_raw_object(fs, object, isDepartment)
+    return rows_written
 
-            flat = (
-                raw
-                .flatten()
-                .select(select)
-                .rename_columns(rename)
-            ).cast(schema)
+# --------------------------------------------------
+# Stage Partitions
+# --------------------------------------------------
 
-            tables.append(flat)
+def open_manifest():
 
-    parquet_tables = pa.concat_tables(tables)
+    """
+    Opens manifest at STAGING_MANIFEST for incremental staging
+    Unset -> context yielding None, full rebuild
+    
+    :return: Manifest context manager
+    """
 
-    output_path = (
-        f"s3://{bucket}/staging/{event_type}/"
-        f"event_date={date}/{event_type}.parquet"
-    )
+    if manifest_path:
+        return Manifest(manifest_path)
 
-    pap.write_table(
-        parquet_tables,
-        output_path,
-        compression="snappy",
-        use_dictionary=True
-    )
+    return nullcontext(None)
 
-    print(f"[OK] Writing Parquet To S3 for {event_type} {date}")
+def part_name(objects: list[FileInfo]) -> str:
+
+    """
+    Part suffix derived from the object set,
+    restaging the same objects overwrites their part files
+    instead of appending a duplicate part
+
+    :param objects: Raw objects staged in the part
+    :type objects: list[FileInfo]
+    :return: Part suffix
+    :rtype: str
+    """
+
+    digest = hashlib.sha256("\n".join(sorted(f.path for f in objects)).encode("utf-8"))
+
+    return digest.hexdigest()[:16]
+
+def plan_partitions(
+        partitions: dict[str, list[FileInfo]],
+        raw_event_type: str,
+        manifest: Manifest | None = None
+        ) -> list[tuple[str, list[FileInfo], str | None]]:
+
+    """
+    Returns partitions to stage with objects to read and part suffix
+    Without manifest every partition is rebuilt
+    With manifest only new objects are read:
+        partition never staged -> part None, partition files written
+        partition staged before -> part named by object set (part_name),
+        appended as part files
+    
+    :param partitions: Raw objects by partition
+    :type partitions: dict[str, list[FileInfo]]
+    :param raw_event_type: Raw event type prefix
+    :type raw_event_type: str
+    :param manifest: Processed-object manifest
+    :type manifest: Manifest | None
+    :return: (partition, objects, part) tuples
+    :rtype: list[tuple[str, list[FileInfo], str | None]]
+    """
+
+    processed = manifest.processed_paths(raw_event_type) if manifest else set()
+    plan = []
+
+    for date, objects in partitions.items():
+
+        new_objects = [f for f in objects if f.path not in processed]
+
+        if not new_objects:
+            continue
+
+        appending = len(new_objects) < len(objects)
+        plan.append((date, new_objects, part_name(new_objects) if appending else None))
+
+    return plan
+
+def stage_partitions(
+        bucket: str,
+        raw_event_type: str,
+        event_type: str,
+        schema: pa.schema,
+        select: list[str],
+        rename: list[str],
+        isDepartment: bool,
+        raw_schema: pa.Schema | None = None,
+        date_type: str = "month",
+        fs: FileSystem | None = None,
+        manifest: Manifest | None = None
+        ) -> dict[str, int]:
+
+    """
+    Lists raw objects for event type and stages each partition
+    Full rebuild without manifest, incremental with manifest
+    (see plan_partitions)
+    
+    :param bucket: S3 Bucket
+    :type bucket: str
+    :param raw_event_type: Raw event type prefix
+    :type raw_event_type: str
+    :param event_type: Staging event type
+    :type event_type: str
+    :param schema: PyArrow schema
+    :type schema: pa.schema
+    :param select: Json fields to select from raw
+    :type select: list[str]
+    :param rename: Rename raw fields
+    :type rename: list[str]
+    :param isDepartment: Determine if event is a department snapshot
+    :type isDepartment: bool
+    :param raw_schema: Raw parse schema
+    :type raw_schema: pa.Schema | None
+    :param date_type: month or year
+    :type date_type: str
+    :param fs: Filesystem, defaults to shared S3 filesystem
+    :type fs: FileSystem | None
+    :param manifest: Processed-object manifest, None for full rebuild
+    :type manifest: Manifest | None
+    :return: Rows written by partition
+    :rtype: dict[str, int]
+    """
+
+    fs = fs or get_filesystem()
+    partitions = get_partitions(bucket, raw_event_type, date_type, fs)
+    rows = {}
+
+    for date, objects, part in plan_partitions(partitions, raw_event_type, manifest):
+
+        rows[date] = build_parquet(
+            bucket,
+            [f.path for f in objects],
+            date,
+            event_type,
+            schema,
+            select,
+            rename,
+            isDepartment,
+            fs=fs,
+            raw_schema=raw_schema,
+            part=part
+        )
+
+        if manifest:
+            manifest.record(
+                raw_event_type,
+                date,
+                objects,
+                staging_output_dir(bucket, event_type)
+            )
+
+    return rows
 
 # --------------------------------------------------
 # Normalise Timestamps
 # --------------------------------------------------
 
-def normalise_timestamp(value: str) -> str:
+def normalise_timestamps(table: pa.Table, columns: tuple[str, ...]) -> pa.Table:
 
     """
-    Normalize timestamp to ISO-8601 UTC string.
-
-    :param value: Input string
-    :type value: str
-    :return: Formatted timestamp
-    :rtype: str
+    Parses ISO-8601 timestamp columns in bulk with Arrow compute
+    Zone offsets applied, converted to UTC,
+    truncated to milliseconds as timestamp("ms", tz="UTC")
+    
+    :param table: Raw table with string timestamp columns
+    :type table: pa.Table
+    :param columns: Timestamp column names
+    :type columns: tuple[str, ...]
+    :return: Table with typed timestamp columns
+    :rtype: pa.Table
     """
 
-    dt = datetime.fromisoformat(value)
+    for column in columns:
+        parsed = pc.cast(
+            pc.cast(table.column(column), pa.timestamp("us", tz="UTC")),
+            pa.timestamp("ms", tz="UTC"),
+            safe=False
+        )
+        table = table.set_column(table.schema.get_field_index(column), column, parsed)
 
-    return (
-        dt.astimezone(timezone.utc)
-          .isoformat(timespec="milliseconds")
-          .replace("+00:00", "Z")
-    )
\ No newline at end of file
+    return table
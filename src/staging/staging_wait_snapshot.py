@@ -1,39 +1,50 @@
 """
 Orchestration for creating waiting list snapshot parquet
-S3 raw json parsed into rows before passing to PyArrow
+S3 raw json decoded by Arrow, selected fields only
 Appended to S3 staging partitioned by YYYY-MM
 """
 
-from src.staging.staging_utils import get_prefixes, build_parquet
+from src.metrics import metrics
+from src.staging.staging_utils import get_filesystem, open_manifest, projection_schema, stage_partitions
+from src.staging.staging_config import staging_bucket
 from src.staging.schemas import waiting_schema
 
+# --------------------------------------------------
+# Waiting List Snapshot Fields
+# --------------------------------------------------
+
+waiting_select = [
+    "event_type",
+    "waiting_count",
+    "phase",
+    "event_ts",
+    "ingestion_ts",
+    "source_system",
+]
+waiting_raw_schema = projection_schema(waiting_select, waiting_select, waiting_schema)
+
 # --------------------------------------------------
 # Entry Point
 # --------------------------------------------------
 
 def main():
 
-    waiting_select = [
-        "event_type",
-        "waiting_count",
-        "phase",
-        "event_ts",
-        "ingestion_ts",
-        "source_system",
-    ]
-
-    waiting_prefixes = get_prefixes("wait_snapshot", "month")
-
-    for month, prefixes in waiting_prefixes.items():
-        build_parquet(
-            "health-data-raw-elt",
-            prefixes,
-            month,
+    metrics.export_at_exit("staging_wait_snapshot")
+    fs = get_filesystem()
+
+    with open_manifest() as manifest, metrics.timer("stage_seconds", stage="staging_wait_snapshot"):
+
+        stage_partitions(
+            staging_bucket,
+            "wait_snapshot",
             "waiting_list_snapshot",
             waiting_schema,
             waiting_select,
             waiting_select,
-            False
+            False,
+            waiting_raw_schema,
+            fs=fs,
+            manifest=manifest
         )
 
 
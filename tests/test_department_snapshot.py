@@ -0,0 +1,50 @@
+"""
+Department snapshot explode
+"""
+
+import pyarrow as pa
+from src.staging.staging_department_snapshot import explode_department_snapshots
+
+def ward(name: str, beds_total: int, beds_occupied: int) -> dict:
+    return {
+        "name": name,
+        "beds_total": beds_total,
+        "beds_occupied": beds_occupied,
+        "beds_available": beds_total - beds_occupied,
+    }
+
+def snapshots(departments: list) -> pa.Table:
+    return pa.Table.from_pylist([
+        {"event_ts": f"2025-01-0{i + 1}T00:00:00+00:00", "phase": "start", "departments": d}
+        for i, d in enumerate(departments)
+    ])
+
+def test_one_row_per_ward_ordered_by_snapshot_then_ward():
+
+    exploded = explode_department_snapshots(snapshots([
+        {"A": ward("A", 10, 2), "B": ward("B", 5, 5)},
+        {"A": ward("A", 10, 3), "B": None}, # ward missing from snapshot
+    ]))
+
+    assert exploded.column_names == [
+        "event_ts", "phase", "ward_name", "beds_total", "beds_occupied", "beds_available"
+    ]
+    assert exploded.select(["event_ts", "ward_name", "beds_occupied"]).to_pylist() == [
+        {"event_ts": "2025-01-01T00:00:00+00:00", "ward_name": "A", "beds_occupied": 2},
+        {"event_ts": "2025-01-01T00:00:00+00:00", "ward_name": "B", "beds_occupied": 5},
+        {"event_ts": "2025-01-02T00:00:00+00:00", "ward_name": "A", "beds_occupied": 3},
+    ]
+
+def test_no_wards_gives_empty_exploded_table():
+
+    raw = pa.table({
+        "event_ts": pa.array(["2025-01-01T00:00:00+00:00"]),
+        "phase": pa.array(["start"]),
+        "departments": pa.array([{}], pa.struct([])),
+    })
+
+    exploded = explode_department_snapshots(raw)
+    expected = explode_department_snapshots(snapshots([{"A": ward("A", 10, 2)}]))
+
+    assert exploded.num_rows == 0
+    assert exploded.schema == expected.schema
@@ -0,0 +1,55 @@
+"""
+Remote manifest single-writer lock
+"""
+
+import json
+import pytest
+from pyarrow.fs import FileInfo, FileType
+from src.staging.manifest import Manifest
+
+@pytest.fixture
+def uri(tmp_path):
+    return f"file://{tmp_path}/manifest.sqlite"
+
+def record(manifest: Manifest, path: str):
+    manifest.record("admission", "2025-01", [FileInfo(path, FileType.File, size=1)], "out.parquet")
+
+def test_second_writer_refused_until_close(uri, tmp_path):
+
+    with Manifest(uri) as manifest:
+        record(manifest, "raw/a.json")
+
+        with pytest.raises(RuntimeError, match="locked by"):
+            Manifest(uri)
+
+    assert not (tmp_path / "manifest.sqlite.lock").exists()
+
+    with Manifest(uri) as manifest:
+        assert manifest.processed_paths("admission") == {"raw/a.json"}
+
+def test_stale_lock_taken_over(uri, tmp_path):
+
+    (tmp_path / "manifest.sqlite.lock").write_text(
+        json.dumps({"token": "crashed", "owner": "host:1", "acquired": 0})
+    )
+
+    with Manifest(uri) as manifest:
+        record(manifest, "raw/a.json")
+
+    with Manifest(uri) as manifest:
+        assert manifest.processed_paths("admission") == {"raw/a.json"}
+
+def test_changed_remote_manifest_not_overwritten(uri, tmp_path):
+
+    with Manifest(uri) as manifest:
+        record(manifest, "raw/a.json")
+
+    manifest = Manifest(uri)
+    record(manifest, "raw/b.json")
+    (tmp_path / "manifest.sqlite").write_bytes(b"written by another run")
+
+    with pytest.raises(RuntimeError, match="changed by another writer"):
+        manifest.close()
+
+    assert (tmp_path / "manifest.sqlite").read_bytes() == b"written by another run"
+    assert not (tmp_path / "manifest.sqlite.lock").exists()
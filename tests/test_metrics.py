@@ -0,0 +1,63 @@
+"""
+Prometheus export of src.metrics
+"""
+
+import re
+import pytest
+from src.metrics import metrics
+
+# label="value" pairs, value escapes limited to \\, \" and \n
+SAMPLE_LINE = re.compile(
+    r'^[a-zA-Z_:][a-zA-Z0-9_:]*'
+    r'(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*"'
+    r'(,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*")*\})?'
+    r' \S+$'
+)
+
+@pytest.fixture
+def registry(monkeypatch):
+
+    monkeypatch.setattr(metrics, "_enabled", True)
+    monkeypatch.setattr(metrics, "_ratios", {})
+    metrics.snapshot(reset=True)
+    yield metrics
+    metrics.snapshot(reset=True)
+
+def test_label_values_escaped(registry):
+
+    registry.set_gauge("raw_buffered_events", 3, path='bucket\\raw/"a"\nb')
+
+    lines = registry.to_prometheus().splitlines()
+
+    assert 'raw_buffered_events{path="bucket\\\\raw/\\"a\\"\\nb"} 3' in lines
+
+def test_exposition_valid_with_special_label_values(registry):
+
+    registry.inc("raw_put_failures_total", error='Timeout "s3"\nretry \\')
+    registry.observe("raw_put_seconds", 0.2, buckets=(0.1, 1.0), key='a"b')
+
+    lines = registry.to_prometheus(job="test").splitlines()
+
+    assert 'raw_put_failures_total{job="test",error="Timeout \\"s3\\"\\nretry \\\\"} 1' in lines
+
+    for line in lines:
+        assert line.startswith("# TYPE ") or SAMPLE_LINE.match(line), line
+
+def test_ratio_computed_from_merged_counters(registry):
+
+    registry.ratio("staging_rows_per_second", "staging_rows_total", "staging_seconds_total")
+
+    workers = []
+
+    for rows, seconds in ((1000, 1.0), (100, 4.0)): # worker processes
+        registry.inc("staging_rows_total", rows, event_type="admission")
+        registry.inc("staging_seconds_total", seconds, event_type="admission")
+        workers.append(registry.snapshot(reset=True))
+
+    for snapshot in workers:
+        registry.merge(snapshot)
+
+    lines = registry.to_prometheus(job="test").splitlines()
+
+    assert "# TYPE staging_rows_per_second gauge" in lines
+    assert 'staging_rows_per_second{job="test",event_type="admission"} 220.0' in lines
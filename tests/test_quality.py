@@ -0,0 +1,116 @@
+"""
+Quality gate checks, quarantine and reports
+"""
+
+import json
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pap
+from pyarrow.fs import FileSelector, LocalFileSystem
+from src.staging.quality import QualityGate, checks_for, discharge_after_admission
+
+SCHEMA = pa.schema([
+    pa.field("patient_id", pa.int64(), nullable=False),
+    pa.field("waiting_time", pa.int16(), nullable=False),
+    pa.field("event_ts", pa.timestamp("ms", tz="UTC"), nullable=False),
+])
+
+def batch(patient_ids: list, waiting_times: list, event_ts: list) -> pa.Table:
+    return pa.table({
+        "patient_id": pa.array(patient_ids, pa.int64()),
+        "waiting_time": pa.array(waiting_times, pa.int64()),
+        "event_ts": pa.array(event_ts, pa.string()),
+    })
+
+def staged_from(tables: dict):
+
+    def staged(event_type: str, start: datetime, end: datetime) -> pa.Table:
+        if event_type not in tables:
+            raise FileNotFoundError(event_type)
+        return tables[event_type]
+
+    return staged
+
+def listing(fs: LocalFileSystem, path: str) -> list[str]:
+    selector = FileSelector(path, allow_not_found=True, recursive=True)
+    return sorted(info.base_name for info in fs.get_file_info(selector) if info.is_file)
+
+def test_failing_rows_quarantined_with_reasons():
+
+    gate = QualityGate(checks_for("admission", SCHEMA, staged_from({})))
+    passed = gate.apply(batch(
+        [1, None, 3, 4],
+        [5, 5, 70000, 5],
+        ["2025-01-01T10:00:00+00:00", "2025-01-01T11:00:00+00:00", "2025-01-01T12:00:00+00:00", "not a date"]
+    ))
+
+    assert passed.column("patient_id").to_pylist() == [1]
+    assert gate.quarantined == 3
+    assert gate.failures["not_null:patient_id"] == 1
+    assert gate.failures["range:waiting_time"] == 1
+    assert gate.failures["timestamp:event_ts"] == 1
+    assert gate.quarantine[0].column("failed_checks").to_pylist() == [
+        "not_null:patient_id", "range:waiting_time", "timestamp:event_ts"
+    ]
+
+def test_write_report_and_quarantine(tmp_path):
+
+    fs = LocalFileSystem()
+    bucket = str(tmp_path)
+    gate = QualityGate(checks_for("admission", SCHEMA, staged_from({})))
+    gate.apply(batch([1, None], [5, 5], ["2025-01-01T10:00:00+00:00"] * 2))
+
+    report = gate.write(fs, bucket, "admission", "2025-01", "abc")
+
+    quality_dir = f"{bucket}/staging/_quality/admission/partition=2025-01"
+    quarantine_dir = f"{bucket}/staging/_quarantine/admission/partition=2025-01"
+
+    with open(f"{quality_dir}/admission_abc.json", encoding="utf-8") as f:
+        assert json.load(f) == report
+
+    assert report["rows"] == 2 and report["passed"] == 1 and report["quarantined"] == 1
+    assert pap.read_table(f"{quarantine_dir}/admission_abc.parquet").num_rows == 1
+
+def test_rebuild_clears_incremental_reports_and_quarantine(tmp_path):
+
+    fs = LocalFileSystem()
+    bucket = str(tmp_path)
+
+    for part in ("abc", "def"):
+        gate = QualityGate(checks_for("admission", SCHEMA, staged_from({})))
+        gate.apply(batch([None], [5], ["2025-01-01T10:00:00+00:00"]))
+        gate.write(fs, bucket, "admission", "2025-01", part)
+
+    gate = QualityGate(checks_for("admission", SCHEMA, staged_from({})))
+    gate.apply(batch([1], [5], ["2025-01-01T10:00:00+00:00"]))
+    gate.write(fs, bucket, "admission", "2025-01", None)
+
+    assert listing(fs, f"{bucket}/staging/_quality/admission/partition=2025-01") == ["admission.json"]
+    assert listing(fs, f"{bucket}/staging/_quarantine/admission/partition=2025-01") == []
+
+def test_discharge_matched_to_latest_admission_across_batches():
+
+    admissions = pa.table({
+        "patient_id": pa.array([1, 1, 2], pa.int64()),
+        "event_ts": pc.cast(pa.array([
+            "2025-01-01T10:00:00+00:00",
+            "2025-01-20T10:00:00+00:00",
+            "2025-01-05T10:00:00+00:00",
+        ]), pa.timestamp("ms", tz="UTC")),
+    })
+    check = discharge_after_admission(staged_from({"admission": admissions}))["discharge_after_admission"]
+
+    first = check(batch([1, 2], [0, 0], ["2025-01-10T10:00:00+00:00", "2025-01-04T10:00:00+00:00"]))
+    assert first.to_pylist() == [True, False] # patient 2 discharged before admission
+
+    # patient 1 readmitted on 2025-01-20, a discharge before that
+    # but after the first discharge (previous batch) has no admission
+    second = check(batch([1, 1], [0, 0], ["2025-01-15T10:00:00+00:00", "2025-01-25T10:00:00+00:00"]))
+    assert second.to_pylist() == [False, True]
+
+def test_discharge_check_skipped_without_staged_admissions():
+
+    check = discharge_after_admission(staged_from({}))["discharge_after_admission"]
+
+    assert check(batch([1], [0], ["2025-01-10T10:00:00+00:00"])) is None
@@ -0,0 +1,82 @@
+"""
+BufferedSink flushing by size and simulation date
+"""
+
+import contextlib
+import io
+from datetime import date
+from src.raw.ingestion.backends import MemoryBackend
+from src.raw.ingestion.s3_write import BufferedSink
+from src.raw.source_gen.admission import generate_admissions
+
+def event(event_type: str, event_ts: str) -> dict:
+    return {"event_type": event_type, "event_ts": event_ts}
+
+def prefixes(backend: MemoryBackend) -> set[str]:
+    return {key.rsplit("/", 1)[0] for key in backend.objects}
+
+def test_size_threshold_flushes_prefix():
+
+    backend = MemoryBackend()
+    sink = BufferedSink(backend, max_events=2, max_bytes=1 << 20)
+
+    sink.write(event("admission", "2025-01-01T10:00:00+00:00"))
+    assert not backend.objects
+
+    sink.write(event("admission", "2025-01-01T11:00:00+00:00"))
+    assert prefixes(backend) == {"admission/event_date=2025-01-01"}
+
+def test_past_days_flush_as_simulation_advances():
+
+    backend = MemoryBackend()
+    sink = BufferedSink(backend, max_events=1000, max_bytes=1 << 20, flush_grace_days=1)
+
+    sink.write(event("admission", "2025-01-01T10:00:00+00:00"))
+    sink.write(event("discharge", "2025-01-05T10:00:00+00:00")) # dated ahead
+    sink.write(event("admission", "2025-01-02T10:00:00+00:00"))
+    assert not backend.objects # within grace
+
+    sink.write(event("admission", "2025-01-03T10:00:00+00:00"))
+    assert prefixes(backend) == {"admission/event_date=2025-01-01"}
+
+    sink.write(event("wait_snapshot", "2025-01-07T00:00:01+00:00"))
+    assert prefixes(backend) == {
+        "admission/event_date=2025-01-01",
+        "admission/event_date=2025-01-02",
+        "admission/event_date=2025-01-03",
+        "discharge/event_date=2025-01-05",
+    }
+
+    sink.close()
+    assert "wait_snapshot/event_date=2025-01-07" in prefixes(backend)
+
+def test_late_event_for_flushed_day_written_as_new_object():
+
+    backend = MemoryBackend()
+    sink = BufferedSink(backend, max_events=1000, max_bytes=1 << 20, flush_grace_days=0)
+
+    sink.write(event("admission", "2025-01-01T10:00:00+00:00"))
+    sink.write(event("admission", "2025-01-02T10:00:00+00:00"))
+    sink.write(event("discharge", "2025-01-01T12:00:00+00:00")) # late
+    sink.write(event("admission", "2025-01-03T10:00:00+00:00"))
+
+    day_objects = [k for k in backend.objects if k.startswith("admission/event_date=2025-01-01/")]
+    assert len(day_objects) == 1
+    assert any(k.startswith("discharge/event_date=2025-01-01/") for k in backend.objects)
+
+def test_generator_puts_during_run():
+
+    backend = MemoryBackend()
+    sink = BufferedSink(backend, max_events=1000, max_bytes=5 * 1024 * 1024)
+    puts_before_final_flush = []
+    flush = sink.flush
+    sink.flush = lambda: (puts_before_final_flush.append(len(backend.objects)), flush())
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_admissions(sink, seed=0, start=date(2025, 1, 1), end=date(2025, 3, 31))
+
+    written = sum(body.count(b"\n") for body in backend.objects.values())
+
+    assert puts_before_final_flush[0] > 0
+    assert len(sink.buffers) == 0
+    assert written == sink.events_written